@@ -1,6 +1,17 @@
 import maya.cmds as cmds
 import os
-import re
+import sys
+
+# 辅助模块 (project_fs、tool_metrics、version_resolver 等) 和工具脚本一起放在项目根目录下
+PROJECT_SCRIPTS_DIR = os.path.normpath(cmds.workspace(query=True, rootDirectory=True))
+if PROJECT_SCRIPTS_DIR not in sys.path:
+    sys.path.append(PROJECT_SCRIPTS_DIR)
+import project_fs
+import tool_metrics
+import version_resolver
+
+# 所有目录查询都通过 project_fs，同一次界面刷新内的结果会被缓存
+fs = project_fs.get_fs(PROJECT_SCRIPTS_DIR)
 
 # 创建工具的用户界面
 def create_builder_tool_ui():
@@ -55,7 +66,7 @@ def get_current_shot():
 
     current_file = os.path.normpath(current_file)
     project_root = get_project_root()
-    relative_path = os.path.relpath(current_file, project_root)
+    relative_path = fs.relpath(current_file, project_root)
     # 将相对路径分割成各个路径部分
     path_parts = relative_path.split(os.sep)
     print(f"path of the current file: {relative_path}")
@@ -74,19 +85,6 @@ def get_current_shot():
     return None, None
 
 
-# 提取资产的基础名称和版本号
-def extract_base_name_and_version(filename):
-    match = re.match(r'(.+?)[._]v(\d+)', filename)
-    if match:
-        base_name = match.group(1)
-        version_number = int(match.group(2))
-        print(f"Extracted base name: {base_name}, version number: {version_number} from {filename}")
-        return base_name, version_number
-    else:
-        print(f"No version number found in {filename}")
-        base_name = os.path.splitext(filename)[0]
-        return base_name, 0
-
 # 获取可用的资产列表
 def get_assets(asset_types):
     global asset_versions_map
@@ -103,36 +101,33 @@ def get_assets(asset_types):
             # 处理 layout 资产
             asset_dir = os.path.join(project_root, 'publish', 'sequence', sequence_name, shot_name, 'layout', 'caches', 'alembic')
             print(f"Layout asset directory: {asset_dir}")
-            if os.path.exists(asset_dir):
-                asset_files = [f for f in os.listdir(asset_dir)
-                               if os.path.isfile(os.path.join(asset_dir, f))]
-                for f in asset_files:
-                    base_name, _ = extract_base_name_and_version(f)
+            # version_resolver 按目录缓存已排序的版本列表，目录未修改时不会重新扫描
+            index = version_resolver.get_index(asset_dir)
+            if index is not None:
+                for base_name, (_, infos) in index.groups.items():
                     assets.add(f"{asset_type}/{base_name}")
-                    asset_versions_map.setdefault((asset_type, base_name), []).append(f)
+                    asset_versions_map[(asset_type, base_name)] = [info.file_name for info in infos]
             else:
                 print(f"Layout directory does not exist: {asset_dir}")
         elif asset_type == 'character':
             # 处理 character 资产
             asset_dir = os.path.join(project_root, 'publish', 'sequence', sequence_name, shot_name, 'animation', 'caches', 'alembic')
             print(f"Character asset directory: {asset_dir}")
-            if os.path.exists(asset_dir):
-                asset_files = [f for f in os.listdir(asset_dir)
-                               if os.path.isfile(os.path.join(asset_dir, f))]
-                for f in asset_files:
-                    base_name, _ = extract_base_name_and_version(f)
+            index = version_resolver.get_index(asset_dir)
+            if index is not None:
+                for base_name, (_, infos) in index.groups.items():
                     assets.add(f"{asset_type}/{base_name}")
-                    asset_versions_map.setdefault((asset_type, base_name), []).append(f)
+                    asset_versions_map[(asset_type, base_name)] = [info.file_name for info in infos]
             else:
                 print(f"No character asset directory: {asset_dir}")
         else:
             # 对于 'prop'、'set' 等资产类型
             asset_dir = os.path.join(project_root, 'publish', 'assets', asset_type)
             print(f"{asset_type.capitalize()} asset directory: {asset_dir}")
-            if os.path.exists(asset_dir):
-                for asset_name in os.listdir(asset_dir):
-                    asset_path = os.path.join(asset_dir, asset_name)
-                    if os.path.isdir(asset_path):
+            entries = fs.scandir(asset_dir)
+            if entries is not None:
+                for asset_name, is_dir, _ in entries:
+                    if is_dir:
                         assets.add(f"{asset_type}/{asset_name}")
                         # 初始化资产版本映射
                         asset_versions_map[(asset_type, asset_name)] = []
@@ -140,6 +135,7 @@ def get_assets(asset_types):
     return sorted(list(assets))
 
 # 更新资产列表，当资产类型选择发生变化时调用
+@project_fs.operation()
 def update_asset_list(*args):
     asset_types = []
     if cmds.checkBox('checkSet', query=True, value=True):
@@ -169,39 +165,34 @@ def get_versions(asset_type, base_name):
     if asset_type in ['layout', 'character']:
         key = (asset_type, base_name)
         if key in asset_versions_map:
-            files = asset_versions_map[key]
-            version_info = []
-            for f in files:
-                file_name = os.path.basename(f)
-                base, version_number = extract_base_name_and_version(file_name)
-                if base == base_name:
-                    version_info.append((version_number, f))
-                    version_map[file_name] = f  # 将文件名映射到相对路径
-            version_info.sort(key=lambda x: x[0], reverse=True)
-            versions.extend([os.path.basename(v[1]) for v in version_info])
+            # 列表已按版本号排好序，最新的版本放在最前面
+            for f in reversed(asset_versions_map[key]):
+                version_map[f] = f  # 将文件名映射到相对路径
+                versions.append(f)
         else:
             print(f"No versions found for asset {asset_type}/{base_name}")
     else:
         asset_dir = os.path.join(project_root, 'publish', 'assets', asset_type, base_name)
-        if os.path.exists(asset_dir):
-            for dept in os.listdir(asset_dir):  # 部门可能是 'model'、'rig' 等
+        dept_entries = fs.scandir(asset_dir)
+        if dept_entries is not None:
+            for dept, is_dir, _ in dept_entries:  # 部门可能是 'model'、'rig' 等
                 dept_path = os.path.join(asset_dir, dept)
-                if os.path.isdir(dept_path):
+                if is_dir:
                     source_dir = os.path.join(dept_path, 'source')
-                    if os.path.exists(source_dir):
-                        files = [f for f in os.listdir(source_dir) if f.endswith(('.ma', '.mb', '.abc', '.fbx'))]
-                        for f in files:
-                            base, version_number = extract_base_name_and_version(f)
-                            # 使用部门和文件名作为版本标签
-                            version_label = f"{dept}/{f}"
-                            versions.append(version_label)
-                            relative_path = os.path.relpath(os.path.join(source_dir, f), asset_dir)
-                            version_map[version_label] = relative_path
+                    for f in version_resolver.all_files(source_dir, ('.ma', '.mb', '.abc', '.fbx')):
+                        # 使用部门和文件名作为版本标签
+                        version_label = f"{dept}/{f}"
+                        versions.append(version_label)
+                        relative_path = fs.relpath(os.path.join(source_dir, f), asset_dir)
+                        version_map[version_label] = relative_path
+            # 按部门、基础名称和数字版本号排序 (v010 排在 v009 之后)，最新的在前
+            versions.sort(key=lambda label: (label.split('/', 1)[0], version_resolver.sort_key(label)), reverse=True)
         else:
             print(f"No versions found for asset {asset_type}/{base_name}")
-    return sorted(versions, reverse=True)
+    return versions
 
 # 当选择资产时，更新版本列表
+@project_fs.operation()
 def on_asset_selected(*args):
     selected_assets = cmds.textScrollList('assetList', query=True, selectItem=True)
     if selected_assets:
@@ -218,6 +209,8 @@ def on_asset_selected(*args):
         cmds.optionMenu('versionMenu', edit=True, deleteAllItems=True)
 
 # 加载选定的资产和版本到当前场景中
+@tool_metrics.timed("load_selected_assets")
+@project_fs.operation()
 def load_selected_assets(*args):
     global version_map
     selected_assets = cmds.textScrollList('assetList', query=True, selectItem=True)
@@ -250,7 +243,7 @@ def load_selected_assets(*args):
             full_file_path = os.path.normpath(file_path)
             print(f"Loading asset from: {full_file_path}")
 
-            if os.path.exists(full_file_path):
+            if fs.exists(full_file_path):
                 namespace = base_name
                 existing_refs = cmds.ls(type='reference')
                 ref_node = None
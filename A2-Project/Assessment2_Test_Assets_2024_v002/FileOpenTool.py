@@ -1,5 +1,22 @@
 import maya.cmds as cmds
 import os
+import sys
+
+# 辅助模块 (wip_archive、project_fs、tool_metrics、version_resolver 等) 和工具脚本一起放在项目根目录下
+PROJECT_SCRIPTS_DIR = os.path.normpath(cmds.workspace(q=True, rootDirectory=True))
+if PROJECT_SCRIPTS_DIR not in sys.path:
+    sys.path.append(PROJECT_SCRIPTS_DIR)
+import wip_archive
+import project_index_client
+import project_fs
+import tool_metrics
+import version_resolver
+
+# 所有目录查询都通过 project_fs，同一次界面刷新内的结果会被缓存
+fs = project_fs.get_fs(PROJECT_SCRIPTS_DIR)
+
+# 已归档版本在列表中的标记
+ARCHIVED_LABEL = " (archived)"
 
     # ------------GUI---------------------↓
 def clear_option_menu(menu_name):
@@ -67,17 +84,30 @@ def get_project_root():
     # 标准化项目根目录路径
     return os.path.normpath(cmds.workspace(q=True, rootDirectory=True))
 
+@tool_metrics.timed("scan_project")
+@project_fs.operation()
 def scan_project():
     project_root = get_project_root()
+    # 如果本机运行了项目索引守护进程，直接使用它的目录缓存
+    catalog = project_index_client.query(project_root, {"op": "scan_project"})
+    if catalog is not None:
+        # 守护进程的目录缓存覆盖的文件数量，与下面逐目录扫描的计数一致
+        tool_metrics.inc("a2_files_scanned_total", catalog["files_scanned"], operation="scan_project")
+        assets_dict = {k: set(v) for k, v in catalog["assets_dict"].items()}
+        shots_dict = {k: set(v) for k, v in catalog["shots_dict"].items()}
+        return catalog["asset_types"], assets_dict, catalog["sequences"], shots_dict
+
     asset_types = set()
     assets_dict = {}  # {asset_type: set(asset_names)}
     sequences = set()
     shots_dict = {}   # {sequence_name: set(shot_names)}
 
-    for root, dirs, files in os.walk(project_root):
+    for root, dirs, files in fs.walk(project_root):
+        # 记录扫描过的文件数量
+        tool_metrics.inc("a2_files_scanned_total", len(files), operation="scan_project")
         for file in files:
             if file.endswith(('.ma', '.mb')):
-                relative_path = os.path.relpath(root, project_root)
+                relative_path = fs.relpath(root, project_root)
                 path_parts = relative_path.split(os.sep)
                 # print("Processing file:", file)
                 # print("Path parts:", path_parts)
@@ -149,6 +179,7 @@ def update_shots(*args):
         cmds.menuItem(label=name, parent='shotMenu')
     update_versions()
 
+@project_fs.operation()
 def update_versions(*args):
     cmds.textScrollList('versionList', edit=True, removeAll=True)
     wip_publish = cmds.optionMenu('wipPublishMenu', query=True, value=True)
@@ -169,12 +200,17 @@ def update_versions(*args):
     search_path = os.path.normpath(search_path)
     print("Search Path:", search_path)
 
-    if os.path.exists(search_path):
-        versions = []
-        for file in os.listdir(search_path):
-            if file.endswith(('.ma', '.mb')):
-                versions.append(file)
-        versions.sort()
+    # 只有 wip 下的旧版本会被归档
+    archived = []
+    if wip_publish == 'wip':
+        archived = wip_archive.list_archived(project_root, search_path)
+
+    index = version_resolver.get_index(search_path, ('.ma', '.mb'))
+    if index is not None or archived:
+        versions = version_resolver.all_files(search_path, ('.ma', '.mb'))
+        versions.extend(file + ARCHIVED_LABEL for file in archived if file not in versions)
+        # 按基础名称和数字版本号排序，v010 排在 v009 之后
+        versions.sort(key=lambda version: version_resolver.sort_key(version.replace(ARCHIVED_LABEL, '')))
         for version in versions:
             file_path = os.path.join(search_path, version)
             # 显示文件名
@@ -183,6 +219,8 @@ def update_versions(*args):
         print("Search path does not exist.")
         
     # Open file
+@tool_metrics.timed("open_selected_file")
+@project_fs.operation()
 def open_selected_file(*args):
     # 从'versionList'文本滚动列表中获取用户选择的文件版本
     selected_files = cmds.textScrollList('versionList', query=True, selectItem=True)
@@ -210,8 +248,20 @@ def open_selected_file(*args):
         # 标准化路径
         file_path = os.path.normpath(file_path)
 
+        # 已归档的版本先从归档中恢复
+        if version.endswith(ARCHIVED_LABEL):
+            version = version[:-len(ARCHIVED_LABEL)]
+            file_path = file_path[:-len(ARCHIVED_LABEL)]
+            if not fs.exists(file_path):
+                try:
+                    wip_archive.restore_version(project_root, os.path.dirname(file_path), version)
+                except (OSError, RuntimeError) as e:
+                    # 归档条目已失效或缺少 zstandard 模块
+                    cmds.warning(f"Could not restore {version}: {e}")
+                    return
+
         # 检查文件是否存在
-        if os.path.exists(file_path):
+        if fs.exists(file_path):
             cmds.file(file_path, open=True, force=True)
             print("Opened file:", file_path)
         else:
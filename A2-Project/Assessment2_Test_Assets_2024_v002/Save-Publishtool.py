@@ -1,6 +1,7 @@
 import maya.cmds as cmds
 import os
-import re
+import sys
+import time
 
 # Base directories for WIP and Publish
 def get_project_root():
@@ -9,10 +10,52 @@ def get_project_root():
 WIP_DIR = os.path.join(get_project_root(), "wip")
 PUBLISH_DIR = os.path.join(get_project_root(), "publish")
 
+# Helper modules (wip_archive, project_fs, fast_copy, tool_metrics, version_resolver etc.) live next to the tools in the project root
+if get_project_root() not in sys.path:
+    sys.path.append(get_project_root())
+import wip_archive
+import project_fs
+import fast_copy
+import tool_metrics
+import version_resolver
+
+# Every filesystem query goes through project_fs so it is cached for one save/publish/listing
+fs = project_fs.get_fs(get_project_root())
+
 # Ensure directory exists
 def ensure_directory_exists(path):
-    if not os.path.exists(path):
-        os.makedirs(path)
+    if not fs.exists(path):
+        fs.makedirs(path)
+
+# Hash algorithm to checksum published scenes with while they are copied (the digest is only
+# printed). Hashing needs the data in user space, which rules out the reflink/copy_file_range/
+# sendfile paths, so it is off by default and large scenes are published zero-copy.
+PUBLISH_CHECKSUM = None
+
+# Copy a scene into publish with a progress bar; the copy is fsynced and renamed into place
+def copy_with_progress(source_file, target_file):
+    cmds.progressWindow(title="Publishing", status=f"Copying {os.path.basename(source_file)}",
+                        progress=0, maxValue=100, isInterruptable=False)
+    def on_progress(copied, total):
+        cmds.progressWindow(edit=True, progress=int(copied * 100 / total) if total else 100)
+    start = time.perf_counter()
+    try:
+        copied, digest, method = fast_copy.copy_file(source_file, target_file, progress=on_progress,
+                                                     hash_name=PUBLISH_CHECKSUM)
+    finally:
+        cmds.progressWindow(endProgress=True)
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    print(f"Copied {source_file} -> {target_file}: {copied / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({copied / elapsed / 1e6:.1f} MB/s via {method})")
+    if digest:
+        print(f"{PUBLISH_CHECKSUM}: {digest}")
+    fs.invalidate(target_file)
+    return digest
+
+# Count the size of a file we just wrote towards the bytes-written metric
+def record_bytes_written(path, **labels):
+    if os.path.isfile(path):
+        tool_metrics.inc("a2_bytes_written_total", os.path.getsize(path), **labels)
 
 # Get save path based on department and asset type
 def determine_save_path(department, asset_type, asset_name, is_publish=False):
@@ -24,14 +67,14 @@ def determine_save_path(department, asset_type, asset_name, is_publish=False):
     ensure_directory_exists(save_path)
     return save_path
 
-# Get next version number for a file in WIP
+# Get next version number for a file in WIP (archived versions keep their numbers)
 def get_next_version(file_path, file_name):
-    version = 1
-    while os.path.exists(f"{file_path}/{file_name}_v{str(version).zfill(3)}.ma"):
-        version += 1
+    archived = wip_archive.list_archived(get_project_root(), file_path)
+    version = version_resolver.next_version(file_path, file_name, (".ma",), taken=archived)
     return str(version).zfill(3)
 
 # Save file with versioning in WIP directory only
+@project_fs.operation()
 def save_wip_file(department, asset_type, asset_name, file_name):
     if not all([department, asset_type, asset_name, file_name]):
         cmds.warning("Please fill in all required fields.")
@@ -40,12 +83,17 @@ def save_wip_file(department, asset_type, asset_name, file_name):
     version = get_next_version(save_path, file_name)
     full_file_name = f"{file_name}_v{version}.ma"
     full_file_path = os.path.join(save_path, full_file_name)
-    cmds.file(rename=full_file_path)
-    cmds.file(save=True, type="mayaAscii")
+    # Only the save itself is timed, not the dialogs around it
+    with tool_metrics.timed("save_wip_file"):
+        cmds.file(rename=full_file_path)
+        cmds.file(save=True, type="mayaAscii")
+        fs.invalidate(full_file_path)
+        record_bytes_written(full_file_path, operation="save_wip_file")
     cmds.confirmDialog(title="Save Successful", message=f"File saved as {full_file_name} in WIP", button=["OK"])
     return full_file_name, version
 
 # Publish file to the publish folder without versioning (final version only)
+@project_fs.operation()
 def publish_file(department, asset_type, asset_name, file_name, frame_range="1 24"):
     # Define publish paths for source and caches
     publish_source_path = determine_save_path(department, asset_type, asset_name, is_publish=True)
@@ -58,27 +106,38 @@ def publish_file(department, asset_type, asset_name, file_name, frame_range="1 2
 
     # Find the latest WIP version to publish
     wip_save_path = determine_save_path(department, asset_type, asset_name)
-    wip_files = sorted([f for f in os.listdir(wip_save_path) if f.startswith(file_name) and f.endswith(".ma")], reverse=True)
-    if not wip_files:
+    latest_wip = version_resolver.latest(wip_save_path, file_name, (".ma",), include_final=False)
+    if latest_wip is None:
         cmds.warning("No WIP file found to publish. Save as WIP before publishing.")
         return
-    # Use the latest versioned WIP file for publishing
-    latest_wip_file = wip_files[0]
-    saved_file = os.path.join(wip_save_path, latest_wip_file)
+    # Use the latest versioned WIP file for publishing (numeric order, so v010 beats v009)
+    saved_file = os.path.join(wip_save_path, latest_wip.file_name)
     published_file = os.path.join(publish_source_path, f"{file_name}_final.ma")
-    if os.path.exists(published_file):
+    if fs.exists(published_file):
         overwrite = cmds.confirmDialog(title="File Exists", message="Published file already exists. Overwrite?", button=["Yes", "No"])
         if overwrite == "No":
             return
-    cmds.sysFile(saved_file, copy=published_file)
+    # Each format is timed on its own so a slow exporter shows up in the metrics report;
+    # bytes are counted inside the block so they are flushed with the timing
+    with tool_metrics.timed("publish_file", format="ma"):
+        copy_with_progress(saved_file, published_file)
+        record_bytes_written(published_file, operation="publish_file", format="ma")
+    # The published name drops the version, so note which WIP file it came from for the archiver
+    wip_archive.record_publish_source(publish_source_path, os.path.basename(published_file), latest_wip.file_name)
 
     # Export Alembic (.abc), FBX (.fbx), and USD (.usd) files
     alembic_path = os.path.join(publish_cache_path_abc, f"{file_name}_final.abc")
     fbx_path = os.path.join(publish_cache_path_fbx, f"{file_name}_final.fbx")
     usd_path = os.path.join(publish_cache_path_usd, f"{file_name}_final.usd")
-    cmds.AbcExport(j=f"-file {alembic_path} -ftr -fr {frame_range}")
-    cmds.file(fbx_path, force=True, options="v=0;", type="FBX export", exportAll=True)
-    cmds.file(usd_path, force=True, options="v=0;", type="USD export", exportAll=True)
+    with tool_metrics.timed("publish_file", format="abc"):
+        cmds.AbcExport(j=f"-file {alembic_path} -ftr -fr {frame_range}")
+        record_bytes_written(alembic_path, operation="publish_file", format="abc")
+    with tool_metrics.timed("publish_file", format="fbx"):
+        cmds.file(fbx_path, force=True, options="v=0;", type="FBX export", exportAll=True)
+        record_bytes_written(fbx_path, operation="publish_file", format="fbx")
+    with tool_metrics.timed("publish_file", format="usd"):
+        cmds.file(usd_path, force=True, options="v=0;", type="USD export", exportAll=True)
+        record_bytes_written(usd_path, operation="publish_file", format="usd")
     cmds.confirmDialog(title="Publish Successful", message=f"File published as {file_name}_final in publish folder", button=["OK"])
 
 # Documentation dialog
@@ -118,7 +177,7 @@ def create_save_publish_tool_ui():
 
     # Save and Publish Buttons with options to view versions
     cmds.frameLayout(label="Actions", collapsable=True)
-    cmds.rowLayout(numberOfColumns=4, columnWidth4=(110, 110, 110, 110), adjustableColumn=3)
+    cmds.rowLayout(numberOfColumns=5, columnWidth5=(110, 110, 110, 110, 110), adjustableColumn=3)
     cmds.button(label="Save (WIP)", width=110, command=lambda *args: save_wip_file(
         cmds.optionMenuGrp('departmentMenu', query=True, value=True),
         cmds.optionMenuGrp('assetTypeMenu', query=True, value=True),
@@ -132,24 +191,71 @@ def create_save_publish_tool_ui():
         cmds.textFieldGrp('fileName', query=True, text=True)
     ))
     cmds.button(label="List Versions", width=110, command=list_versions)
+    cmds.button(label="Restore Archived", width=110, command=restore_archived_version)
     cmds.button(label="Documentation", width=110, command=lambda *args: show_documentation())
     cmds.setParent('..')
     
     cmds.showWindow(window)
 
+# WIP saves are named {file_name}_vNNN, so match on the File Name field (the Asset Name if it is empty)
+def get_version_base_name():
+    return cmds.textFieldGrp('fileName', query=True, text=True) or cmds.textFieldGrp('assetName', query=True, text=True)
+
+# Archived WIP versions (.ma and .mb) of a file, newest first
+def get_archived_versions(save_path, base_name):
+    archived = [info for info in map(version_resolver.parse_version, wip_archive.list_archived(get_project_root(), save_path))
+                if info.base_name == base_name and info.is_numbered]
+    return sorted(archived, key=lambda info: info.version, reverse=True)
+
+# Bring an archived WIP version back to fast storage when the user asks for it
+@project_fs.operation()
+def restore_archived_version(*args):
+    asset_type = cmds.optionMenuGrp('assetTypeMenu', query=True, value=True)
+    asset_name = cmds.textFieldGrp('assetName', query=True, text=True)
+    department = cmds.optionMenuGrp('departmentMenu', query=True, value=True)
+    save_path = determine_save_path(department, asset_type, asset_name)
+    base_name = get_version_base_name()
+    archived = [info.file_name for info in get_archived_versions(save_path, base_name)]
+    if not archived:
+        cmds.warning(f"No archived versions of {base_name} in {save_path}.")
+        return
+    result = cmds.promptDialog(title="Archived Versions",
+                               message="Enter the file name of the archived version to restore:",
+                               text=archived[0], button=["Restore", "Cancel"],
+                               defaultButton="Restore", cancelButton="Cancel", dismissString="Cancel")
+    if result != "Restore":
+        return
+    file_name = cmds.promptDialog(query=True, text=True)
+    if file_name not in archived:
+        cmds.warning(f"{file_name} is not an archived version.")
+        return
+    try:
+        wip_archive.restore_version(get_project_root(), save_path, file_name)
+    except (OSError, RuntimeError) as e:
+        # Missing/stale archive entry or zstandard not installed in this Maya
+        cmds.warning(f"Could not restore {file_name}: {e}")
+
 # List file versions for selected asset in WIP folder
+@project_fs.operation()
 def list_versions(*args):
     asset_type = cmds.optionMenuGrp('assetTypeMenu', query=True, value=True)
     asset_name = cmds.textFieldGrp('assetName', query=True, text=True)
     department = cmds.optionMenuGrp('departmentMenu', query=True, value=True)
     save_path = determine_save_path(department, asset_type, asset_name)
-    versions = sorted([f for f in os.listdir(save_path) if re.match(rf"{asset_name}_v\d+.ma", f)], reverse=True)
+    base_name = get_version_base_name()
+    versions = [(info.version, info.file_name)
+                for info in version_resolver.all_versions(save_path, base_name, wip_archive.SCENE_EXTENSIONS)
+                if info.is_numbered]
+    archived = get_archived_versions(save_path, base_name)
+    versions = sorted(versions + [(info.version, f"{info.file_name} (archived)") for info in archived], reverse=True)
     if versions:
-        print(f"Versions for {asset_name} (WIP):")
-        for v in versions:
+        print(f"Versions for {base_name} (WIP):")
+        for _, v in versions:
             print(v)
+        if archived:
+            print("Use Restore Archived to bring an archived version back.")
     else:
-        cmds.warning(f"No versions found for {asset_name} in {save_path}.")
+        cmds.warning(f"No versions found for {base_name} in {save_path}.")
 
 # Run the Save & Publish Tool UI
 create_save_publish_tool_ui()
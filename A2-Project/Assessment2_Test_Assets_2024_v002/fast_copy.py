@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import errno
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Bytes moved per kernel call / per read when streaming
+CHUNK_SIZE = 64 * 1024 * 1024
+# ioctl(FICLONE) asks btrfs/xfs to share the source blocks instead of copying them
+FICLONE = 0x40049409
+# errno values that mean "this method is not available here, try the next one"
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY,
+                      getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EBADF, errno.EPERM}
+
+
+def _reflink(src_fd, dst_fd, size, offset, progress):
+    if fcntl is None or offset:
+        return None
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError as e:
+        if e.errno in UNSUPPORTED_ERRNOS:
+            return None
+        raise
+    progress(size, size)
+    return size
+
+
+def _kernel_copy(copy_call, src_fd, dst_fd, size, offset, progress, chunk_size):
+    # Returns (new offset, ok); ok is False when this method cannot finish the copy, and the
+    # next method carries on from the offset (some filesystems return 0 instead of an errno)
+    while offset < size:
+        try:
+            copied = copy_call(src_fd, dst_fd, offset, min(chunk_size, size - offset))
+        except OSError as e:
+            if e.errno in UNSUPPORTED_ERRNOS:
+                return offset, False
+            raise
+        if copied == 0:
+            return offset, False
+        offset += copied
+        progress(offset, size)
+    return offset, True
+
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd, dst_fd, offset, count):
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _stream(src_fd, dst_fd, size, offset, progress, chunk_size, hasher):
+    # One pass through user space with a reused buffer; the hash sees every byte exactly once
+    buffer = bytearray(min(chunk_size, max(size - offset, 1)))
+    view = memoryview(buffer)
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    with open(src_fd, "rb", buffering=0, closefd=False) as source:
+        while True:
+            read = source.readinto(buffer)
+            if not read:
+                break
+            chunk = view[:read]
+            if hasher is not None:
+                hasher.update(chunk)
+            written = 0
+            while written < read:
+                written += os.write(dst_fd, chunk[written:])
+            offset += read
+            progress(offset, size)
+    return offset
+
+
+def _fsync_directory(path):
+    # Makes the rename itself durable; directories cannot be opened on Windows
+    if os.name != "posix":
+        return
+    dir_fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+# Copy src to dst through a temporary file that is fsynced and then renamed into place.
+# With hash_name the file is streamed once and hashed on the way; without it the
+# fastest kernel path is used: reflink, copy_file_range, sendfile, then streaming.
+# progress(copied_bytes, total_bytes) is called as data moves.
+# Returns (bytes_copied, hexdigest or None, method)
+def copy_file(src, dst, progress=None, hash_name=None, chunk_size=CHUNK_SIZE):
+    progress = progress or (lambda copied, total: None)
+    hasher = hashlib.new(hash_name) if hash_name else None
+    dst_dir = os.path.dirname(os.path.abspath(dst))
+    temp_path = os.path.join(dst_dir, f".{os.path.basename(dst)}.partial")
+
+    src_fd = os.open(src, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(src_fd).st_size
+        dst_fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            method = None
+            offset = 0
+            if hasher is None:
+                if _reflink(src_fd, dst_fd, size, offset, progress) is not None:
+                    method, offset = "reflink", size
+                if method is None and hasattr(os, "copy_file_range"):
+                    offset, ok = _kernel_copy(_copy_file_range, src_fd, dst_fd, size, offset, progress, chunk_size)
+                    method = "copy_file_range" if ok else None
+                if method is None and hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+                    offset, ok = _kernel_copy(_sendfile, src_fd, dst_fd, size, offset, progress, chunk_size)
+                    method = "sendfile" if ok else None
+            if method is None:
+                offset = _stream(src_fd, dst_fd, size, offset, progress, chunk_size, hasher)
+                method = "stream"
+            # A kernel call returning 0 early (or a source that changed size) must not be committed
+            if offset != size:
+                raise OSError(errno.EIO, f"Short copy via {method}: {offset} of {size} bytes", src)
+            os.fsync(dst_fd)
+        finally:
+            os.close(dst_fd)
+        shutil.copymode(src, temp_path)
+        os.replace(temp_path, dst)
+        _fsync_directory(dst_dir)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        os.close(src_fd)
+    return offset, hasher.hexdigest() if hasher else None, method
+
+
+# ------------Benchmark---------------------
+def _make_test_file(path, size):
+    block = os.urandom(16 * 1024 * 1024)
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            written += f.write(block[:min(len(block), size - written)])
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _time_copy(label, copy, src, dst, size):
+    start = time.perf_counter()
+    result = copy(src, dst)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s {size / elapsed / 1e6:10.1f} MB/s")
+    os.remove(dst)
+    return result
+
+
+def _copyfile_fsync(src, dst):
+    shutil.copyfile(src, dst)
+    with open(dst, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+# cmds.sysFile only exists inside Maya; a plain buffered copy is the closest stand-in outside it
+def run_benchmark(directory, size_gb=2.0):
+    size = int(size_gb * 1024 ** 3)
+    src = os.path.join(directory, "fast_copy_bench_src.mb")
+    dst = os.path.join(directory, "fast_copy_bench_dst.mb")
+    print(f"Creating {size / 1e9:.2f} GB test scene in {directory}")
+    _make_test_file(src, size)
+    try:
+        _time_copy("shutil.copyfile (baseline)", shutil.copyfile, src, dst, size)
+        # copy_file always fsyncs before the rename, so also time the baseline with the same guarantee
+        _time_copy("shutil.copyfile + fsync", _copyfile_fsync, src, dst, size)
+        method = _time_copy("copy_file", lambda s, d: copy_file(s, d)[2], src, dst, size)
+        print(f"  (used {method})")
+        _time_copy("copy_file + sha1", lambda s, d: copy_file(s, d, hash_name="sha1"), src, dst, size)
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare publish copy throughput on a large scene file.")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="Directory on the filesystem to test")
+    parser.add_argument("--size-gb", type=float, default=2.0)
+    args = parser.parse_args()
+    run_benchmark(args.dir, args.size_gb)
@@ -0,0 +1,260 @@
+import os
+import stat
+import time
+import threading
+import contextlib
+
+import project_index_client
+
+
+class LocalBackend:
+    # Plain local/NFS access; every call is one round-trip to the storage
+
+    def scandir(self, path, mtime_ns=None):
+        with os.scandir(path) as it:
+            return [(entry.name, entry.is_dir(), entry.is_file()) for entry in it]
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def note_write(self, path):
+        pass
+
+
+class DaemonBackend:
+    # Ask the project index daemon first, go to `disk` when it is not running or may be behind.
+    # The daemon is one poll behind the disk: listings of directories this session wrote to
+    # are only used once the daemon has rescanned them, so answering costs no extra round-trip.
+
+    # Writes older than this are forgotten, the daemon has long since picked them up
+    WRITE_MEMORY_NS = 60 * 10 ** 9
+
+    def __init__(self, project_root, disk=None):
+        self.project_root = os.path.normpath(project_root)
+        self.disk = disk or LocalBackend()
+        self._writes = {}  # {directory: time_ns of our last write in it}
+        self._lock = threading.Lock()
+
+    def _is_inside(self, path):
+        return path == self.project_root or path.startswith(self.project_root + os.sep)
+
+    # A write to path changes its parent's listing (and its own, if it is a folder)
+    def note_write(self, path):
+        now = time.time_ns()
+        path = os.path.normpath(path)
+        with self._lock:
+            for changed in (path, os.path.dirname(path)):
+                if self._is_inside(changed):
+                    self._writes[changed] = now
+            for old in [p for p, written in self._writes.items() if now - written > self.WRITE_MEMORY_NS]:
+                del self._writes[old]
+
+    # mtime_ns: the caller has just stat'd the directory, so the listing must be of exactly that state
+    def scandir(self, path, mtime_ns=None):
+        path = os.path.normpath(path)
+        if not self._is_inside(path):
+            return self.disk.scandir(path)
+        result = project_index_client.query(self.project_root, {"op": "listdir", "path": path})
+        if result is None:
+            return self.disk.scandir(path)
+        with self._lock:
+            written = self._writes.get(path)
+        if not result["exists"]:
+            if written is None:
+                raise FileNotFoundError(path)
+            return self.disk.scandir(path)  # we may have just created it
+        if mtime_ns is not None:
+            fresh = mtime_ns == result["mtime_ns"] and result["scan_ns"] - mtime_ns > project_index_client.RACY_NS
+        else:
+            fresh = written is None or result["scan_ns"] > written
+        if not fresh:
+            return self.disk.scandir(path)
+        return [tuple(entry) for entry in result["entries"]]
+
+    def stat(self, path):
+        return self.disk.stat(path)
+
+
+class SlowBackend:
+    # Wraps another backend, adds a fixed latency per call and counts the round-trips
+
+    def __init__(self, inner=None, latency=0.005):
+        self.inner = inner or LocalBackend()
+        self.latency = latency
+        self.round_trips = {"scandir": 0, "stat": 0}
+
+    def total_round_trips(self):
+        return sum(self.round_trips.values())
+
+    def scandir(self, path, mtime_ns=None):
+        self.round_trips["scandir"] += 1
+        time.sleep(self.latency)
+        return self.inner.scandir(path, mtime_ns)
+
+    def stat(self, path):
+        self.round_trips["stat"] += 1
+        time.sleep(self.latency)
+        return self.inner.stat(path)
+
+    def note_write(self, path):
+        self.inner.note_write(path)
+
+
+# Per-thread operation state: nesting depth and one cache per ProjectFS instance
+_state = threading.local()
+
+
+# Cache listings and stats until the outermost operation ends.
+# Works as a context manager or as a decorator on a UI callback.
+@contextlib.contextmanager
+def operation():
+    depth = getattr(_state, "depth", 0)
+    if depth == 0:
+        _state.caches = {}
+    _state.depth = depth + 1
+    try:
+        yield
+    finally:
+        _state.depth = depth
+        if depth == 0:
+            _state.caches = {}
+
+
+class ProjectFS:
+    # os.path-style queries that are cached for the length of an operation
+    # (one UI refresh, one save...). Outside an operation every call hits the backend.
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalBackend()
+
+    def _cache(self):
+        if not getattr(_state, "depth", 0):
+            return None
+        return _state.caches.setdefault(id(self), {"listings": {}, "stats": {}})
+
+    def operation(self):
+        return operation()
+
+    # Forget what we know about a path after writing to it
+    def invalidate(self, path):
+        path = os.path.normpath(path)
+        self.backend.note_write(path)
+        cache = self._cache()
+        if cache is None:
+            return
+        # makedirs may have created several levels, so walk up through every ancestor
+        while True:
+            cache["listings"].pop(path, None)
+            cache["stats"].pop(path, None)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+
+    # [(name, is_dir, is_file)] for a directory, or None if it does not exist
+    def scandir(self, path):
+        path = os.path.normpath(path)
+        cache = self._cache()
+        if cache is not None and path in cache["listings"]:
+            return cache["listings"][path]
+        try:
+            entries = self.backend.scandir(path)
+        except (FileNotFoundError, NotADirectoryError):
+            entries = None
+        if cache is not None:
+            cache["listings"][path] = entries
+        return entries
+
+    def listdir(self, path):
+        entries = self.scandir(path)
+        if entries is None:
+            raise FileNotFoundError(path)
+        return [name for name, _, _ in entries]
+
+    # Like os.walk (top-down), built on the cached listings; hidden folders are skipped
+    def walk(self, top):
+        pending = [os.path.normpath(top)]
+        while pending:
+            root = pending.pop()
+            entries = self.scandir(root)
+            if entries is None:
+                continue
+            dirs = [name for name, is_dir, _ in entries if is_dir and not name.startswith('.')]
+            files = [name for name, _, is_file in entries if is_file]
+            yield root, dirs, files
+            pending.extend(os.path.join(root, d) for d in reversed(dirs))
+
+    # (is_dir, is_file) for a path, None if missing; answered from the parent listing when we have it
+    def _kind(self, path):
+        path = os.path.normpath(path)
+        cache = self._cache()
+        if cache is not None:
+            parent, name = os.path.split(path)
+            if parent in cache["listings"]:
+                entries = cache["listings"][parent]
+                for entry_name, is_dir, is_file in entries or []:
+                    if entry_name == name:
+                        return is_dir, is_file
+                return None
+            if path in cache["listings"]:
+                return (True, False) if cache["listings"][path] is not None else None
+            if path in cache["stats"]:
+                return cache["stats"][path]
+        try:
+            mode = self.backend.stat(path).st_mode
+            kind = (stat.S_ISDIR(mode), stat.S_ISREG(mode))
+        except (FileNotFoundError, NotADirectoryError):
+            kind = None
+        if cache is not None:
+            cache["stats"][path] = kind
+        return kind
+
+    def exists(self, path):
+        return self._kind(path) is not None
+
+    def isdir(self, path):
+        kind = self._kind(path)
+        return bool(kind and kind[0])
+
+    def isfile(self, path):
+        kind = self._kind(path)
+        return bool(kind and kind[1])
+
+    def relpath(self, path, start):
+        # Pure string work on absolute paths, no round-trip needed
+        return os.path.relpath(os.path.normpath(path), os.path.normpath(start))
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+        # Any level up to the first folder that already existed may be new
+        path = os.path.normpath(path)
+        while True:
+            self.invalidate(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+
+
+# One shared layer per project, backed by the index daemon when it is running
+_project_fs = {}
+
+
+def get_fs(project_root):
+    project_root = os.path.normpath(project_root)
+    if project_root not in _project_fs:
+        _project_fs[project_root] = ProjectFS(DaemonBackend(project_root))
+    return _project_fs[project_root]
+
+
+def set_backend(project_root, backend):
+    get_fs(project_root).backend = backend
+
+
+# Backend of the registered project that contains path (plain disk access outside every project)
+def backend_for(path):
+    path = os.path.normpath(path)
+    roots = [root for root in _project_fs if path == root or path.startswith(root.rstrip(os.sep) + os.sep)]
+    if not roots:
+        return LocalBackend()
+    return _project_fs[max(roots, key=len)].backend
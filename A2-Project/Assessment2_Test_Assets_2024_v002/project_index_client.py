@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import socket
+import hashlib
+import tempfile
+import threading
+import argparse
+import asyncio
+
+# Seconds to wait for the daemon before falling back to direct scanning
+QUERY_TIMEOUT = 0.5
+# After a failed connection, do not retry for this many seconds
+RETRY_INTERVAL = 5.0
+
+# A directory scanned within this window of its mtime may change again in the same mtime tick
+RACY_NS = 2 * 10 ** 9
+
+# One persistent connection per project root and thread: replies are matched to requests
+# by order on the socket, so two threads must never share one
+_local = threading.local()
+_unavailable_until = {}
+_unavailable_lock = threading.Lock()
+
+
+def _connections():
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+    return _local.connections
+
+
+def _mark_unavailable(project_root):
+    with _unavailable_lock:
+        _unavailable_until[project_root] = time.monotonic() + RETRY_INTERVAL
+
+
+def _is_unavailable(project_root):
+    with _unavailable_lock:
+        return time.monotonic() < _unavailable_until.get(project_root, 0)
+
+
+# Each project gets its own socket so several projects can be indexed at once
+def get_socket_path(project_root):
+    digest = hashlib.md5(os.path.normpath(project_root).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"a2_project_index_{digest}.sock")
+
+
+def _close_connection(project_root):
+    connection = _connections().pop(project_root, None)
+    if connection:
+        try:
+            connection[0].close()
+        except OSError:
+            pass
+
+
+def _get_connection(project_root):
+    connections = _connections()
+    if project_root in connections:
+        return connections[project_root]
+    if not hasattr(socket, "AF_UNIX") or _is_unavailable(project_root):
+        return None
+    socket_path = get_socket_path(project_root)
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(QUERY_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        _mark_unavailable(project_root)
+        return None
+    connections[project_root] = (sock, sock.makefile("rb"))
+    return connections[project_root]
+
+
+# Send one request to the daemon; returns None when it is not running
+def query(project_root, request):
+    project_root = os.path.normpath(project_root)
+    connection = _get_connection(project_root)
+    if not connection:
+        return None
+    sock, reader = connection
+    try:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = reader.readline()
+        if not line:
+            raise OSError("daemon closed the connection")
+        response = json.loads(line)
+    except (OSError, ValueError):
+        _close_connection(project_root)
+        _mark_unavailable(project_root)
+        return None
+    if "error" in response:
+        print(f"Project index error: {response['error']}")
+        return None
+    return response.get("result")
+
+
+def is_daemon_running(project_root):
+    return query(project_root, {"op": "ping"}) == "pong"
+
+
+# ------------Load test---------------------
+async def _load_test_client(socket_path, requests, latencies):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+# Hammer the daemon with a mix of listdir and scan_project queries
+def run_load_test(project_root, clients=8, requests_per_client=500):
+    project_root = os.path.normpath(project_root)
+    socket_path = get_socket_path(project_root)
+    directories = []
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        directories.append(root)
+
+    def make_requests(offset):
+        requests = []
+        for i in range(requests_per_client):
+            if i % 10 == 0:
+                requests.append({"op": "scan_project"})
+            else:
+                requests.append({"op": "listdir", "path": directories[(offset + i) % len(directories)]})
+        return requests
+
+    async def main():
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*[_load_test_client(socket_path, make_requests(c), latencies) for c in range(clients)])
+        return latencies, time.perf_counter() - start
+
+    latencies, elapsed = asyncio.run(main())
+    latencies.sort()
+    print(f"{len(latencies)} queries from {clients} clients in {elapsed:.3f}s "
+          f"({len(latencies) / elapsed:.0f} queries/s)")
+    for label, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        print(f"{label}: {_percentile(latencies, fraction) * 1000:.3f} ms")
+    return latencies, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or load-test the project index daemon.")
+    parser.add_argument("project_root")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client")
+    args = parser.parse_args()
+    if not is_daemon_running(args.project_root):
+        parser.exit(1, "Project index daemon is not running for this project.\n")
+    run_load_test(args.project_root, args.clients, args.requests)
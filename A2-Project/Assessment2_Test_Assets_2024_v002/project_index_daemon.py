@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import threading
+
+from project_index_client import get_socket_path, RACY_NS
+
+# How often the watcher re-stats every indexed directory
+POLL_INTERVAL = 1.0
+
+
+class ProjectIndex:
+    # Directory listings of the whole project, keyed by normalised path.
+    # refresh runs on a worker thread and handle on the event loop, so both go through _lock.
+
+    def __init__(self, project_root):
+        self.project_root = os.path.normpath(project_root)
+        self.dirs = {}  # {path: (mtime_ns, [(name, is_dir, is_file)], scan_ns)}
+        self._catalog = None
+        self._lock = threading.Lock()
+        self.query_count = 0
+
+    def _scan_dir(self, path):
+        scan_ns = time.time_ns()
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            entries = [(entry.name, entry.is_dir(), entry.is_file()) for entry in it]
+        return mtime_ns, entries, scan_ns
+
+    # Index a directory and everything below it into `into` (hidden folders such as .mayaSwatches are skipped)
+    def _scan_tree(self, top, into):
+        pending = [top]
+        while pending:
+            path = pending.pop()
+            try:
+                into[path] = self._scan_dir(path)
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+            for name, is_dir, _ in into[path][1]:
+                if is_dir and not name.startswith('.'):
+                    pending.append(os.path.join(path, name))
+
+    def build(self):
+        dirs = {}
+        self._scan_tree(self.project_root, dirs)
+        with self._lock:
+            self.dirs = dirs
+            self._catalog = None
+
+    def is_inside(self, path):
+        return path == self.project_root or path.startswith(self.project_root + os.sep)
+
+    # Re-stat every indexed directory and rescan the ones whose mtime changed, or that were
+    # scanned so soon after a change that a second change in the same mtime tick could be hidden.
+    # Disk access happens without the lock; the results are swapped in at the end.
+    def refresh(self):
+        with self._lock:
+            snapshot = dict(self.dirs)
+        updates = {}
+        removed = []
+        changed = False
+        for path, cached in snapshot.items():
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                removed.append(path)
+                continue
+            if mtime_ns == cached[0] and cached[2] - cached[0] > RACY_NS:
+                continue
+            try:
+                scanned = self._scan_dir(path)
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                removed.append(path)
+                continue
+            updates[path] = scanned
+            if sorted(scanned[1]) == sorted(cached[1]):
+                continue
+            changed = True
+            old_names = {name for name, is_dir, _ in cached[1] if is_dir}
+            for name, is_dir, _ in scanned[1]:
+                child = os.path.join(path, name)
+                if is_dir and not name.startswith('.') and (name not in old_names or child not in snapshot):
+                    self._scan_tree(child, updates)
+
+        with self._lock:
+            for path in removed:
+                prefix = path + os.sep
+                for child in [p for p in self.dirs if p == path or p.startswith(prefix)]:
+                    self.dirs.pop(child, None)
+            self.dirs.update(updates)
+            if removed or changed:
+                self._catalog = None
+        return bool(removed or changed)
+
+    def needs_scan(self, path):
+        path = os.path.normpath(path)
+        with self._lock:
+            return self.is_inside(path) and path not in self.dirs
+
+    # Hidden or not yet indexed directory: scan it without the lock (called from a worker
+    # thread, so a slow share does not block the event loop) and keep it watched
+    def scan_on_demand(self, path):
+        path = os.path.normpath(path)
+        try:
+            scanned = self._scan_dir(path)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return
+        with self._lock:
+            self.dirs.setdefault(path, scanned)
+
+    def listdir(self, path):
+        path = os.path.normpath(path)
+        if not self.is_inside(path):
+            raise ValueError(f"{path} is outside the project")
+        cached = self.dirs.get(path)
+        if cached is None:
+            return {"exists": False, "entries": []}
+        # Clients compare mtime_ns with their own stat to tell whether this listing is still current
+        return {"exists": True, "entries": cached[1], "mtime_ns": cached[0], "scan_ns": cached[2]}
+
+    # Same result as FileOpenTool.scan_project, computed from the cached listings.
+    # Hidden folders listed on demand are left out, as they are from its walk.
+    def scan_project(self):
+        if self._catalog is not None:
+            return self._catalog
+        assets_dict = {}
+        shots_dict = {}
+        files_scanned = 0
+        for path, (_, entries, _) in self.dirs.items():
+            relative_path = os.path.relpath(path, self.project_root)
+            if any(part.startswith('.') and part != '.' for part in relative_path.split(os.sep)):
+                continue
+            files_scanned += sum(1 for _, _, is_file in entries if is_file)
+            if not any(is_file and name.endswith(('.ma', '.mb')) for name, _, is_file in entries):
+                continue
+            path_parts = relative_path.split(os.sep)
+            if "assets" in path_parts:
+                assets_index = path_parts.index("assets")
+                if len(path_parts) > assets_index + 2:
+                    assets_dict.setdefault(path_parts[assets_index + 1], set()).add(path_parts[assets_index + 2])
+            elif "sequence" in path_parts or "sequences" in path_parts:
+                seq_index = path_parts.index("sequence" if "sequence" in path_parts else "sequences")
+                if len(path_parts) > seq_index + 2:
+                    shots_dict.setdefault(path_parts[seq_index + 1], set()).add(path_parts[seq_index + 2])
+        self._catalog = {
+            "asset_types": sorted(assets_dict),
+            "assets_dict": {k: sorted(v) for k, v in assets_dict.items()},
+            "sequences": sorted(shots_dict),
+            "shots_dict": {k: sorted(v) for k, v in shots_dict.items()},
+            "files_scanned": files_scanned,
+        }
+        return self._catalog
+
+    def handle(self, request):
+        with self._lock:
+            return self._handle(request)
+
+    def _handle(self, request):
+        self.query_count += 1
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "listdir":
+            return self.listdir(request["path"])
+        if op == "scan_project":
+            return self.scan_project()
+        if op == "stats":
+            return {"directories": len(self.dirs), "queries": self.query_count}
+        raise ValueError(f"Unknown op: {op}")
+
+
+async def _serve_client(index, reader, writer):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if request.get("op") == "listdir" and index.needs_scan(request["path"]):
+                    await loop.run_in_executor(None, index.scan_on_demand, request["path"])
+                response = {"result": index.handle(request)}
+            except Exception as e:
+                response = {"error": str(e)}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _watch(index, interval):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        # stat calls run off the event loop so queries are never blocked by a slow share
+        if await loop.run_in_executor(None, index.refresh):
+            print(f"Project index updated ({len(index.dirs)} directories)")
+
+
+def is_socket_served(socket_path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+async def run_daemon(project_root, interval=POLL_INTERVAL):
+    index = ProjectIndex(project_root)
+    socket_path = get_socket_path(index.project_root)
+    if os.path.exists(socket_path):
+        # Only a socket left behind by a crashed daemon may be replaced
+        if is_socket_served(socket_path):
+            raise RuntimeError(f"A project index daemon is already serving {index.project_root} on {socket_path}")
+        os.remove(socket_path)
+    index.build()
+    server = await asyncio.start_unix_server(lambda r, w: _serve_client(index, r, w), path=socket_path)
+    print(f"Indexed {len(index.dirs)} directories under {index.project_root}")
+    print(f"Listening on {socket_path}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    watcher = asyncio.ensure_future(_watch(index, interval))
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        watcher.cancel()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the project catalog to local Maya sessions over a Unix socket.")
+    parser.add_argument("project_root")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between change polls")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_daemon(args.project_root, args.interval))
+    except RuntimeError as e:
+        parser.exit(1, f"{e}\n")
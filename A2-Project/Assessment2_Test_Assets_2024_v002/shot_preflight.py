@@ -0,0 +1,246 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import project_fs
+import version_resolver
+
+SCENE_EXTENSIONS = ('.ma', '.mb')
+# Shot caches BuilderTest loads: (asset type, department folder)
+SHOT_CACHES = (('layout', 'layout'), ('character', 'animation'))
+# References are stored near the top of a scene file, no need to read the whole thing
+REFERENCE_SCAN_BYTES = 2 * 1024 * 1024
+MA_REFERENCE_PATTERN = re.compile(rb'file\s+-r[^;]*?"([^"]+\.(?:mb|ma|abc|fbx|usd))"')
+
+
+# (base_name, version) as the tools resolve it; _final sorts after every numbered version
+def parse_version(file_name):
+    info = version_resolver.parse_version(file_name)
+    return info.base_name, info.version
+
+
+# Latest file per base name in a directory: {base_name: (version, file_name)}
+def latest_versions(file_names):
+    latest = {}
+    for file_name in file_names:
+        base_name, version = parse_version(file_name)
+        if base_name not in latest or version > latest[base_name][0]:
+            latest[base_name] = (version, file_name)
+    return latest
+
+
+# Scan publish/assets once: {asset_name: {"type": asset_type, "versions": ["dept/file", ...]}}
+def build_asset_catalog(fs, project_root):
+    catalog = {}
+    assets_dir = os.path.join(project_root, 'publish', 'assets')
+    for asset_type, is_dir, _ in fs.scandir(assets_dir) or []:
+        if not is_dir or asset_type.startswith('.'):
+            continue
+        type_dir = os.path.join(assets_dir, asset_type)
+        for asset_name, is_dir, _ in fs.scandir(type_dir) or []:
+            if not is_dir or asset_name.startswith('.'):
+                continue
+            versions = []
+            asset_dir = os.path.join(type_dir, asset_name)
+            for dept, is_dir, _ in fs.scandir(asset_dir) or []:
+                if is_dir:
+                    for f, _, is_file in fs.scandir(os.path.join(asset_dir, dept, 'source')) or []:
+                        if is_file and f.endswith(('.ma', '.mb', '.abc', '.fbx')):
+                            versions.append(f"{dept}/{f}")
+            catalog[asset_name] = {"type": asset_type, "versions": sorted(versions)}
+    return catalog
+
+
+# Shots to check: [(sequence, shot)] under publish/sequence
+def find_shots(fs, project_root, sequence=None):
+    shots = []
+    sequence_root = os.path.join(project_root, 'publish', 'sequence')
+    for sequence_name, is_dir, _ in fs.scandir(sequence_root) or []:
+        if not is_dir or sequence_name.startswith('.') or (sequence and sequence_name != sequence):
+            continue
+        for shot_name, is_dir, _ in fs.scandir(os.path.join(sequence_root, sequence_name)) or []:
+            if is_dir and not shot_name.startswith('.'):
+                shots.append((sequence_name, shot_name))
+    return sorted(shots)
+
+
+# Paths in the FREF chunks of a Maya binary file; the chunk data starts with the NUL-terminated path.
+# FOR4 files use a 4 byte size after the tag, FOR8 files 4 bytes of padding and an 8 byte size.
+def _mb_references(data):
+    data_offset = 16 if data[:4] == b'FOR8' else 8
+    references = []
+    start = data.find(b'FREF')
+    while start != -1:
+        path_start = start + data_offset
+        path_end = data.find(b'\x00', path_start)
+        if path_end != -1:
+            references.append(data[path_start:path_end])
+        start = data.find(b'FREF', start + 4)
+    return references
+
+
+# Asset scenes are shared by many shots, so each file is only read once per run
+_reference_cache = {}
+_reference_lock = threading.Lock()
+
+
+# Reference paths stored in a scene file header
+def read_references(file_path):
+    with _reference_lock:
+        if file_path in _reference_cache:
+            return _reference_cache[file_path]
+    with open(file_path, 'rb') as f:
+        data = f.read(REFERENCE_SCAN_BYTES)
+    if file_path.endswith('.ma'):
+        raw_references = [match.group(1) for match in MA_REFERENCE_PATTERN.finditer(data)]
+    else:
+        raw_references = _mb_references(data)
+    references = []
+    for raw in raw_references:
+        path = raw.decode('utf-8', 'replace')
+        if path and path not in references:
+            references.append(path)
+    with _reference_lock:
+        _reference_cache[file_path] = references
+    return references
+
+
+# Resolve a stored reference path to this project (paths may be project-relative or from another machine)
+def resolve_reference(fs, project_root, reference):
+    reference = reference.replace('\\', '/')
+    if os.path.isabs(reference) and fs.isfile(reference):
+        return os.path.normpath(reference)
+    parts = reference.split('/')
+    for root_folder in ('publish', 'wip'):
+        if root_folder in parts:
+            relative_path = parts[parts.index(root_folder):]
+            return os.path.normpath(os.path.join(project_root, *relative_path))
+    return os.path.normpath(os.path.join(project_root, reference))
+
+
+# Run every check for one shot and return its report entry
+def check_shot(fs, project_root, sequence_name, shot_name, catalog):
+    report = {"sequence": sequence_name, "shot": shot_name, "caches": {}, "references": [],
+              "errors": [], "warnings": []}
+    shot_dir = os.path.join(project_root, 'publish', 'sequence', sequence_name, shot_name)
+    with project_fs.operation():
+        # 1. layout and animation Alembic caches exist
+        for asset_type, dept in SHOT_CACHES:
+            cache_dir = os.path.join(shot_dir, dept, 'caches', 'alembic')
+            files = [f for f, _, is_file in fs.scandir(cache_dir) or [] if is_file and f.endswith('.abc')]
+            if not files:
+                report["errors"].append(f"No {dept} Alembic cache in {cache_dir}")
+                continue
+            latest = latest_versions(files)
+            report["caches"][asset_type] = sorted(file_name for _, file_name in latest.values())
+            if asset_type == 'character':
+                # <shot>_<asset>_animation caches must point at a published asset
+                for base_name in latest:
+                    asset_name = base_name[len(shot_name) + 1:] if base_name.startswith(shot_name + '_') else base_name
+                    asset_name = asset_name.rsplit('_', 1)[0] if asset_name.endswith('_' + dept) else asset_name
+                    if asset_name not in catalog:
+                        report["warnings"].append(f"Cache {base_name} has no published asset named {asset_name}")
+                    elif not catalog[asset_name]["versions"]:
+                        report["errors"].append(f"Asset {asset_name} has no published versions")
+
+        # 2. referenced set/prop versions in the latest published shot scenes exist
+        referenced_types = set()
+        pending = []
+        for dept, is_dir, _ in fs.scandir(shot_dir) or []:
+            if not is_dir:
+                continue
+            source_dir = os.path.join(shot_dir, dept, 'source')
+            scenes = [f for f, _, is_file in fs.scandir(source_dir) or [] if is_file and f.endswith(SCENE_EXTENSIONS)]
+            for _, file_name in latest_versions(scenes).values():
+                pending.append(os.path.join(source_dir, file_name))
+
+        seen = set()
+        while pending:
+            scene = pending.pop()
+            if scene in seen:
+                continue
+            seen.add(scene)
+            try:
+                references = read_references(scene)
+            except (IOError, OSError) as e:
+                report["errors"].append(f"Cannot read {scene}: {e}")
+                continue
+            for reference in references:
+                resolved = resolve_reference(fs, project_root, reference)
+                parts = fs.relpath(resolved, project_root).split(os.sep)
+                if 'assets' in parts and len(parts) > parts.index('assets') + 1:
+                    referenced_types.add(parts[parts.index('assets') + 1])
+                exists = fs.isfile(resolved)
+                report["references"].append({"scene": fs.relpath(scene, project_root),
+                                             "reference": reference, "exists": exists})
+                if exists:
+                    if resolved.endswith(SCENE_EXTENSIONS):
+                        pending.append(resolved)
+                    continue
+                missing = version_resolver.parse_version(os.path.basename(resolved))
+                siblings = [f for f, _, _ in fs.scandir(os.path.dirname(resolved)) or []
+                            if parse_version(f)[0] == missing.base_name]
+                if siblings:
+                    report["errors"].append(f"{reference} ({missing.label}) is missing, "
+                                            f"available: {', '.join(version_resolver.sort_files(siblings))}")
+                else:
+                    report["errors"].append(f"{reference} is missing and has no published versions")
+
+        for asset_type in ('set', 'prop'):
+            if asset_type not in referenced_types:
+                report["warnings"].append(f"No {asset_type} is referenced by the shot scenes")
+
+    report["ok"] = not report["errors"]
+    return report
+
+
+# use_daemon=False reads the disk directly, e.g. to compare against the project index daemon
+def run_preflight(project_root, sequence=None, shot=None, workers=16, use_daemon=True):
+    project_root = os.path.abspath(project_root)
+    fs = project_fs.get_fs(project_root) if use_daemon else project_fs.ProjectFS(project_fs.LocalBackend())
+    start = time.perf_counter()
+    with project_fs.operation():
+        catalog = build_asset_catalog(fs, project_root)
+        shots = [s for s in find_shots(fs, project_root, sequence) if not shot or s[1] == shot]
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        reports = list(executor.map(lambda s: check_shot(fs, project_root, s[0], s[1], catalog), shots))
+
+    failed = [r for r in reports if not r["ok"]]
+    return {
+        "project_root": project_root,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "summary": {"shots": len(reports), "passed": len(reports) - len(failed), "failed": len(failed)},
+        "shots": reports,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that every shot can be built before dailies.")
+    parser.add_argument("project_root")
+    parser.add_argument("--sequence", help="Only check this sequence")
+    parser.add_argument("--shot", help="Only check this shot")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--no-daemon", action="store_true", help="Read the disk directly even if the index daemon is running")
+    args = parser.parse_args()
+
+    result = run_preflight(args.project_root, args.sequence, args.shot, args.workers, not args.no_daemon)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    summary = result["summary"]
+    print(f"{summary['passed']}/{summary['shots']} shots passed in {result['elapsed_seconds']}s", file=sys.stderr)
+    for report in result["shots"]:
+        for error in report["errors"]:
+            print(f"{report['sequence']}/{report['shot']}: {error}", file=sys.stderr)
+    sys.exit(1 if summary["failed"] else 0)
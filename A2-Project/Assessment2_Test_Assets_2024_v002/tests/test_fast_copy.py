@@ -0,0 +1,76 @@
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_copy
+
+
+def stop_after_first_chunk(copy_call):
+    # A kernel copy that moves one chunk and then returns 0, as some filesystems do
+    calls = []
+
+    def call(src_fd, dst_fd, offset, count):
+        calls.append(offset)
+        return copy_call(src_fd, dst_fd, offset, count) if len(calls) == 1 else 0
+    return call
+
+
+class CopyFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.src = os.path.join(self.directory, "scene.mb")
+        self.dst = os.path.join(self.directory, "scene_final.mb")
+        self.data = os.urandom(300 * 1024)
+        with open(self.src, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_dst(self):
+        with open(self.dst, "rb") as f:
+            return f.read()
+
+    def test_copy_is_complete_and_leaves_no_partial_file(self):
+        copied, digest, _ = fast_copy.copy_file(self.src, self.dst)
+        self.assertEqual(copied, len(self.data))
+        self.assertIsNone(digest)
+        self.assertEqual(self.read_dst(), self.data)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["scene.mb", "scene_final.mb"])
+
+    def test_hash_streams_every_byte(self):
+        _, digest, method = fast_copy.copy_file(self.src, self.dst, hash_name="sha1")
+        self.assertEqual(method, "stream")
+        self.assertEqual(digest, hashlib.sha1(self.data).hexdigest())
+
+    def test_kernel_copy_returning_zero_hands_over_to_the_next_method(self):
+        with mock.patch.object(fast_copy, "_reflink", return_value=None), \
+                mock.patch.object(fast_copy, "_copy_file_range", stop_after_first_chunk(fast_copy._copy_file_range)), \
+                mock.patch.object(fast_copy, "_sendfile", stop_after_first_chunk(fast_copy._sendfile)):
+            copied, _, method = fast_copy.copy_file(self.src, self.dst, chunk_size=64 * 1024)
+        self.assertEqual(copied, len(self.data))
+        self.assertEqual(method, "stream")
+        self.assertEqual(self.read_dst(), self.data)
+
+    def test_source_shrinking_during_the_copy_is_not_committed(self):
+        stream = fast_copy._stream
+
+        def truncate_source(src_fd, dst_fd, size, offset, progress, chunk_size, hasher):
+            os.truncate(self.src, 1000)
+            return stream(src_fd, dst_fd, size, offset, progress, chunk_size, hasher)
+        with mock.patch.object(fast_copy, "_stream", truncate_source):
+            with self.assertRaises(OSError):
+                fast_copy.copy_file(self.src, self.dst, hash_name="sha1")
+        self.assertFalse(os.path.exists(self.dst))
+        self.assertEqual(os.listdir(self.directory), ["scene.mb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import project_fs
+import version_resolver
+import project_index_client
+
+# Directory mtimes are set this far back so the daemon's listings are outside the racy window
+OLD_MTIME = time.time() - 3600
+
+
+def make_tree(root):
+    wip = os.path.join(root, "wip")
+    os.makedirs(os.path.join(wip, "sub"))
+    for name in ("hero_v001.ma", "hero_v002.ma", "hero_v010.ma"):
+        with open(os.path.join(wip, name), "w") as f:
+            f.write("//Maya ASCII\n")
+    for path in (os.path.join(wip, "sub"), wip, root):
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+    return wip
+
+
+class ProjectFSTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.wip = make_tree(self.root)
+        self.disk = project_fs.SlowBackend(project_fs.LocalBackend(), latency=0)
+        self.fs = project_fs.ProjectFS(self.disk)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_uncached_calls_hit_the_backend(self):
+        self.fs.listdir(self.wip)
+        self.fs.listdir(self.wip)
+        self.fs.isdir(os.path.join(self.wip, "sub"))
+        self.assertEqual(self.disk.round_trips, {"scandir": 2, "stat": 1})
+
+    def test_operation_answers_from_one_listing(self):
+        with self.fs.operation():
+            names = self.fs.listdir(self.wip)
+            self.assertTrue(self.fs.isdir(os.path.join(self.wip, "sub")))
+            self.assertTrue(self.fs.isfile(os.path.join(self.wip, "hero_v001.ma")))
+            self.assertFalse(self.fs.exists(os.path.join(self.wip, "hero_v003.ma")))
+            self.fs.listdir(self.wip)
+        self.assertEqual(sorted(names), ["hero_v001.ma", "hero_v002.ma", "hero_v010.ma", "sub"])
+        self.assertEqual(self.disk.round_trips, {"scandir": 1, "stat": 0})
+
+    def test_missing_directory_is_cached(self):
+        missing = os.path.join(self.root, "missing")
+        with self.fs.operation():
+            self.assertIsNone(self.fs.scandir(missing))
+            self.assertFalse(self.fs.exists(missing))
+        self.assertEqual(self.disk.total_round_trips(), 1)
+
+    def test_invalidate_rescans_the_written_directory(self):
+        new_file = os.path.join(self.wip, "hero_v011.ma")
+        with self.fs.operation():
+            self.fs.listdir(self.wip)
+            with open(new_file, "w") as f:
+                f.write("//Maya ASCII\n")
+            self.fs.invalidate(new_file)
+            self.assertIn("hero_v011.ma", self.fs.listdir(self.wip))
+            self.assertTrue(self.fs.isfile(new_file))
+        self.assertEqual(self.disk.round_trips, {"scandir": 2, "stat": 0})
+
+    def test_makedirs_invalidates_every_new_level(self):
+        new_dir = os.path.join(self.root, "publish", "assets")
+        with self.fs.operation():
+            self.assertFalse(self.fs.exists(os.path.join(self.root, "publish")))
+            self.fs.makedirs(new_dir)
+            self.assertTrue(self.fs.isdir(new_dir))
+            self.assertEqual(self.fs.listdir(new_dir), [])
+
+    def test_resolver_rescans_only_changed_directories(self):
+        project_fs.set_backend(self.root, self.disk)
+        version_resolver.invalidate()
+        self.assertEqual(version_resolver.latest(self.wip, "hero").file_name, "hero_v010.ma")
+        self.assertEqual(self.disk.round_trips, {"scandir": 1, "stat": 1})
+        # Unchanged directory: one stat, no listing
+        version_resolver.latest(self.wip, "hero")
+        self.assertEqual(self.disk.round_trips, {"scandir": 1, "stat": 2})
+        with open(os.path.join(self.wip, "hero_v011.ma"), "w") as f:
+            f.write("//Maya ASCII\n")
+        self.assertEqual(version_resolver.latest(self.wip, "hero").file_name, "hero_v011.ma")
+        self.assertEqual(self.disk.round_trips, {"scandir": 2, "stat": 3})
+        project_fs._project_fs.pop(os.path.normpath(self.root))
+
+
+@unittest.skipUnless(hasattr(os, "fork") and hasattr(__import__("socket"), "AF_UNIX"), "needs Unix sockets")
+class DaemonBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.wip = make_tree(self.root)
+        self.daemon = subprocess.Popen(
+            [sys.executable, os.path.join(PROJECT_DIR, "project_index_daemon.py"), self.root, "--interval", "0.5"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while not project_index_client.is_daemon_running(self.root):
+            if time.monotonic() > deadline or self.daemon.poll() is not None:
+                self.fail("project index daemon did not start")
+            # A failed connection is not retried for RETRY_INTERVAL, so forget it while waiting
+            project_index_client._unavailable_until.clear()
+            time.sleep(0.05)
+        self.disk = project_fs.SlowBackend(project_fs.LocalBackend(), latency=0)
+        self.fs = project_fs.ProjectFS(project_fs.DaemonBackend(self.root, self.disk))
+
+    def tearDown(self):
+        self.daemon.terminate()
+        self.daemon.wait()
+        project_index_client._close_connection(os.path.normpath(self.root))
+        project_fs._project_fs.pop(os.path.normpath(self.root), None)
+        shutil.rmtree(self.root)
+
+    def wait_for_daemon(self, path, condition):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            result = project_index_client.query(self.root, {"op": "listdir", "path": path})
+            if result and condition(result):
+                return
+            time.sleep(0.05)
+        self.fail(f"daemon did not pick up the change in {path}")
+
+    def test_listing_costs_no_disk_round_trip(self):
+        self.assertEqual(sorted(self.fs.listdir(self.wip)), ["hero_v001.ma", "hero_v002.ma", "hero_v010.ma", "sub"])
+        self.assertEqual(self.fs.listdir(os.path.join(self.wip, "sub")), [])
+        self.assertEqual(self.disk.total_round_trips(), 0)
+
+    def test_missing_directory_costs_no_disk_round_trip(self):
+        self.assertIsNone(self.fs.scandir(os.path.join(self.wip, "missing")))
+        self.assertEqual(self.disk.total_round_trips(), 0)
+
+    def test_outside_the_project_goes_to_disk(self):
+        self.fs.scandir(os.path.dirname(self.root))
+        self.assertEqual(self.disk.round_trips["scandir"], 1)
+
+    def test_written_directory_goes_to_disk_until_the_daemon_rescans(self):
+        new_file = os.path.join(self.wip, "hero_v011.ma")
+        with open(new_file, "w") as f:
+            f.write("//Maya ASCII\n")
+        self.fs.invalidate(new_file)
+        self.assertIn("hero_v011.ma", self.fs.listdir(self.wip))
+        self.assertEqual(self.disk.round_trips["scandir"], 1)
+        # Other directories are still served by the daemon
+        self.fs.listdir(self.root)
+        self.assertEqual(self.disk.round_trips["scandir"], 1)
+        self.wait_for_daemon(self.wip, lambda result: ["hero_v011.ma", False, True] in result["entries"])
+        self.assertIn("hero_v011.ma", self.fs.listdir(self.wip))
+        self.assertEqual(self.disk.round_trips["scandir"], 1)
+
+    def test_makedirs_distrusts_the_folder_that_gained_a_child(self):
+        new_dir = os.path.join(self.wip, "new", "deeper")
+        self.fs.makedirs(new_dir)
+        self.assertIn("new", self.fs.listdir(self.wip))
+        self.assertEqual(self.disk.round_trips["scandir"], 1)
+        # Folders the daemon has never seen are scanned on demand, after the write
+        self.assertEqual(self.fs.listdir(os.path.dirname(new_dir)), ["deeper"])
+        self.assertEqual(self.fs.listdir(new_dir), [])
+        self.assertEqual(self.disk.round_trips["scandir"], 1)
+
+    def test_resolver_uses_its_own_stat_instead_of_a_second_one(self):
+        project_fs.set_backend(self.root, self.fs.backend)
+        version_resolver.invalidate()
+        self.assertEqual(version_resolver.latest(self.wip, "hero").file_name, "hero_v010.ma")
+        self.assertEqual(self.disk.round_trips, {"scandir": 0, "stat": 1})
+
+    def test_resolver_does_not_trust_a_listing_older_than_the_directory(self):
+        project_fs.set_backend(self.root, self.fs.backend)
+        version_resolver.invalidate()
+        # Written by someone else: no note_write, only the mtime tells
+        with open(os.path.join(self.wip, "hero_v011.ma"), "w") as f:
+            f.write("//Maya ASCII\n")
+        self.assertEqual(version_resolver.latest(self.wip, "hero").file_name, "hero_v011.ma")
+        self.assertEqual(self.disk.round_trips, {"scandir": 1, "stat": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
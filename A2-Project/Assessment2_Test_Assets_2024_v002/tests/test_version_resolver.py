@@ -0,0 +1,52 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import version_resolver
+
+
+def touch(directory, *names):
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        with open(os.path.join(directory, name), "w") as f:
+            f.write("//Maya ASCII\n")
+
+
+class VersionResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        version_resolver.invalidate()
+
+    def tearDown(self):
+        version_resolver.invalidate()
+        shutil.rmtree(self.root)
+
+    def test_versions_sort_numerically_with_final_last(self):
+        touch(self.root, "hero_v009.ma", "hero_v010.ma", "hero_v002.mb", "hero_final.ma", "prop.v001.ma")
+        self.assertEqual([info.label for info in version_resolver.all_versions(self.root, "hero")],
+                         ["v002", "v009", "v010", "final"])
+        self.assertEqual(version_resolver.latest(self.root, "hero", include_final=False).file_name, "hero_v010.ma")
+        self.assertEqual(version_resolver.next_version(self.root, "hero", taken=["hero_v014.ma"]), 15)
+        self.assertEqual(version_resolver.base_names(self.root, (".ma",)), ["hero", "prop"])
+
+    def test_index_cache_keeps_the_most_recently_used_directories(self):
+        directories = [os.path.join(self.root, f"shot{i}") for i in range(4)]
+        for directory in directories:
+            touch(directory, "layout_v001.ma")
+        with mock.patch.object(version_resolver, "MAX_DIRECTORIES", 2):
+            for directory in directories[:3]:
+                version_resolver.get_index(directory)
+            version_resolver.get_index(directories[1])
+            version_resolver.get_index(directories[3])
+            self.assertEqual([key[0] for key in version_resolver._directories],
+                             [os.path.normpath(directories[1]), os.path.normpath(directories[3])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+import re
+import time
+import socket
+import argparse
+import threading
+import contextlib
+
+# Every Maya session on this workstation appends to the same file; override with A2_METRICS_FILE
+METRICS_FILE_ENV = "A2_METRICS_FILE"
+DEFAULT_METRICS_FILE = os.path.join(os.path.expanduser("~"), ".a2_tool_metrics", "metrics.prom")
+
+DURATION_METRIC = "a2_operation_duration_seconds"
+OPERATIONS_METRIC = "a2_operations_total"
+# Upper bounds (seconds) of the latency histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+SESSION_ID = f"{socket.gethostname()}-{os.getpid()}-{int(time.time())}"
+
+_lock = threading.Lock()
+_counters = {}     # {(name, labels): value}
+_histograms = {}   # {labels: [bucket counts..., +Inf count, sum]}
+_dirty = set()     # series touched since the last flush
+
+
+def get_metrics_file():
+    return os.environ.get(METRICS_FILE_ENV) or DEFAULT_METRICS_FILE
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join('{0}="{1}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs) + "}"
+
+
+# Add to a counter, e.g. inc("a2_bytes_written_total", size, operation="publish_file", format="abc")
+def inc(name, value=1, **labels):
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+        _dirty.add(("counter", key))
+
+
+def observe(seconds, **labels):
+    key = _label_key(labels)
+    with _lock:
+        histogram = _histograms.setdefault(key, [0] * (len(DURATION_BUCKETS) + 2))
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[len(DURATION_BUCKETS)] += 1
+        histogram[-1] += seconds
+        _dirty.add(("histogram", key))
+
+
+# Time an operation; works as a context manager or as a decorator on a tool function
+@contextlib.contextmanager
+def timed(operation, **labels):
+    labels = dict(labels, operation=operation)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        observe(time.perf_counter() - start, **labels)
+        inc(OPERATIONS_METRIC, 1, status=status, **labels)
+        flush()
+
+
+# Append the current value of every touched series, labelled with this session, in Prometheus text format
+def flush():
+    with _lock:
+        dirty = sorted(_dirty)
+        _dirty.clear()
+        lines = []
+        timestamp = int(time.time() * 1000)
+        session = (("session", SESSION_ID),)
+        for kind, key in dirty:
+            if kind == "counter":
+                name, labels = key
+                lines.append(f"{name}{_format_labels(labels, session)} {_counters[key]} {timestamp}")
+                continue
+            histogram = _histograms[key]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                lines.append(f"{DURATION_METRIC}_bucket{_format_labels(key, session + (('le', repr(bound)),))} "
+                             f"{histogram[i]} {timestamp}")
+            lines.append(f"{DURATION_METRIC}_bucket{_format_labels(key, session + (('le', '+Inf'),))} "
+                         f"{histogram[len(DURATION_BUCKETS)]} {timestamp}")
+            lines.append(f"{DURATION_METRIC}_sum{_format_labels(key, session)} {histogram[-1]:.6f} {timestamp}")
+            lines.append(f"{DURATION_METRIC}_count{_format_labels(key, session)} "
+                         f"{histogram[len(DURATION_BUCKETS)]} {timestamp}")
+    if not lines:
+        return
+    metrics_file = get_metrics_file()
+    try:
+        os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+        # One append per flush so concurrent sessions do not interleave lines
+        with open(metrics_file, "a") as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError as e:
+        print(f"Could not write metrics to {metrics_file}: {e}")
+
+
+# ------------Aggregation---------------------
+SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)(?:\s+\d+)?$')
+LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+# Latest value of every series in the file (counters and buckets are cumulative per session)
+def read_samples(metrics_file):
+    latest = {}
+    with open(metrics_file) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            match = SAMPLE_PATTERN.match(line)
+            if not match:
+                continue
+            name, label_text, value = match.groups()
+            labels = tuple(sorted(LABEL_PATTERN.findall(label_text or "")))
+            latest[(name, labels)] = float(value)
+    return latest
+
+
+def _strip(labels, *names):
+    return tuple((k, v) for k, v in labels if k not in names)
+
+
+# Same linear interpolation inside a bucket as Prometheus' histogram_quantile
+def bucket_quantile(quantile, buckets):
+    buckets = sorted(buckets, key=lambda b: b[0])
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    rank = quantile * total
+    previous_bound, previous_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return previous_bound
+            if count == previous_count:
+                return bound
+            return previous_bound + (bound - previous_bound) * (rank - previous_count) / (count - previous_count)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+
+# Merge every session into {series labels: {"buckets", "count", "sum", "errors"}} and counter totals
+def aggregate(metrics_file):
+    histograms = {}
+    counters = {}
+    for (name, labels), value in read_samples(metrics_file).items():
+        if name == DURATION_METRIC + "_bucket":
+            le = dict(labels)["le"]
+            key = _strip(labels, "session", "le")
+            buckets = histograms.setdefault(key, {"buckets": {}, "count": 0, "sum": 0.0})["buckets"]
+            bound = float("inf") if le == "+Inf" else float(le)
+            buckets[bound] = buckets.get(bound, 0) + value
+        elif name == DURATION_METRIC + "_count":
+            histograms.setdefault(_strip(labels, "session"), {"buckets": {}, "count": 0, "sum": 0.0})["count"] += value
+        elif name == DURATION_METRIC + "_sum":
+            histograms.setdefault(_strip(labels, "session"), {"buckets": {}, "count": 0, "sum": 0.0})["sum"] += value
+        else:
+            key = (name, _strip(labels, "session"))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def print_report(metrics_file):
+    histograms, counters = aggregate(metrics_file)
+    sessions = {dict(labels).get("session") for (_, labels) in read_samples(metrics_file)}
+    print(f"{len(sessions)} sessions in {metrics_file}")
+    print(f"{'operation':<40} {'count':>7} {'errors':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for key in sorted(histograms):
+        data = histograms[key]
+        label = ",".join(v if k == "operation" else f"{k}={v}" for k, v in key)
+        buckets = list(data["buckets"].items())
+        errors = sum(v for (name, labels), v in counters.items()
+                     if name == OPERATIONS_METRIC and dict(labels).get("status") == "error"
+                     and _strip(labels, "status") == key)
+        quantiles = [bucket_quantile(q, buckets) for q in (0.50, 0.95, 0.99)]
+        print(f"{label:<40} {int(data['count']):>7} {int(errors):>7} "
+              + " ".join(f"{q * 1000:>7.0f}ms" if q is not None else f"{'-':>9}" for q in quantiles))
+    totals = [(name, labels, value) for (name, labels), value in counters.items() if name != OPERATIONS_METRIC]
+    if totals:
+        print()
+        for name, labels, value in sorted(totals):
+            print(f"{name}{_format_labels(labels)} {value:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report p50/p95/p99 latency per tool operation across sessions.")
+    parser.add_argument("--file", default=get_metrics_file(), help="Metrics file to read")
+    args = parser.parse_args()
+    if not os.path.isfile(args.file):
+        parser.exit(1, f"No metrics file at {args.file}\n")
+    print_report(args.file)
@@ -0,0 +1,201 @@
+import os
+import re
+import time
+import bisect
+import argparse
+import threading
+import functools
+import collections
+
+import project_fs
+from project_index_client import RACY_NS
+
+# name.v001.mb, name_v001.ma (and name_v001_note.ma) and name_final.ma all resolve to "name"
+VERSION_PATTERN = re.compile(r'(.+?)[._]v(\d+)')
+FINAL_PATTERN = re.compile(r'(.+?)[._]final$', re.IGNORECASE)
+# _final is the published version, so it sorts after every numbered one
+FINAL_VERSION = 10 ** 9
+# Directory indexes kept in memory; the least recently used one is dropped beyond this
+MAX_DIRECTORIES = 2048
+
+
+class VersionInfo(collections.namedtuple("VersionInfo", "base_name version extension file_name")):
+    # version is 0 for files without a version and FINAL_VERSION for _final files
+
+    @property
+    def is_final(self):
+        return self.version == FINAL_VERSION
+
+    @property
+    def is_numbered(self):
+        return 0 < self.version < FINAL_VERSION
+
+    @property
+    def label(self):
+        if self.is_final:
+            return "final"
+        if not self.version:
+            return "unversioned"
+        return f"v{self.version:03d}"
+
+
+# Parse a file name once; the same names come back on every UI refresh
+@functools.lru_cache(maxsize=65536)
+def parse_version(file_name):
+    stem, extension = os.path.splitext(file_name)
+    match = VERSION_PATTERN.match(file_name)
+    if match:
+        return VersionInfo(match.group(1), int(match.group(2)), extension, file_name)
+    match = FINAL_PATTERN.match(stem)
+    if match:
+        return VersionInfo(match.group(1), FINAL_VERSION, extension, file_name)
+    return VersionInfo(stem, 0, extension, file_name)
+
+
+# Sort key for lists that do not come from one directory: by base name, then numerically by version
+def sort_key(file_name):
+    info = parse_version(os.path.basename(file_name))
+    return info.base_name, info.version, file_name
+
+
+def sort_files(file_names, reverse=False):
+    return sorted(file_names, key=sort_key, reverse=reverse)
+
+
+class DirectoryIndex:
+    # Version files of one directory: {base_name: ([version numbers], [VersionInfo])}, both sorted
+
+    def __init__(self, mtime_ns, scan_ns, groups):
+        self.mtime_ns = mtime_ns
+        self.scan_ns = scan_ns
+        self.groups = groups
+
+    def is_current(self, mtime_ns):
+        return mtime_ns == self.mtime_ns and self.scan_ns - self.mtime_ns > RACY_NS
+
+
+# {(directory, extensions): DirectoryIndex}, least recently used first
+_directories = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+def _build_index(backend, directory, extensions, mtime_ns):
+    scan_ns = time.time_ns()
+    groups = {}
+    for name, _, is_file in backend.scandir(directory, mtime_ns):
+        if name.startswith('.') or not is_file:
+            continue
+        if extensions and not name.endswith(extensions):
+            continue
+        info = parse_version(name)
+        groups.setdefault(info.base_name, []).append(info)
+    for base_name, infos in groups.items():
+        infos.sort(key=lambda info: (info.version, info.file_name))
+        groups[base_name] = ([info.version for info in infos], infos)
+    return DirectoryIndex(mtime_ns, scan_ns, groups)
+
+
+# Sorted version lists of a directory, rebuilt only when the directory mtime changed.
+# Goes through the project's project_fs backend (daemon, slow-storage counters...) but not
+# its per-operation cache, since the mtime check is what keeps these lists fresh.
+def get_index(directory, extensions=None):
+    directory = os.path.normpath(directory)
+    extensions = tuple(extensions) if extensions else None
+    backend = project_fs.backend_for(directory)
+    try:
+        mtime_ns = backend.stat(directory).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        with _lock:
+            _directories.pop((directory, extensions), None)
+        return None
+    key = (directory, extensions)
+    with _lock:
+        index = _directories.get(key)
+        if index is not None:
+            _directories.move_to_end(key)
+    if index is not None and index.is_current(mtime_ns):
+        return index
+    try:
+        index = _build_index(backend, directory, extensions, mtime_ns)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    with _lock:
+        _directories[key] = index
+        _directories.move_to_end(key)
+        while len(_directories) > MAX_DIRECTORIES:
+            _directories.popitem(last=False)
+    return index
+
+
+def invalidate(directory=None):
+    with _lock:
+        if directory is None:
+            _directories.clear()
+            return
+        directory = os.path.normpath(directory)
+        for key in [key for key in _directories if key[0] == directory]:
+            del _directories[key]
+
+
+def base_names(directory, extensions=None):
+    index = get_index(directory, extensions)
+    return sorted(index.groups) if index else []
+
+
+# Every version of base_name in a directory, oldest first
+def all_versions(directory, base_name, extensions=None):
+    index = get_index(directory, extensions)
+    if not index or base_name not in index.groups:
+        return []
+    return list(index.groups[base_name][1])
+
+
+# Every version file of a directory, grouped by base name and oldest first
+def all_files(directory, extensions=None):
+    index = get_index(directory, extensions)
+    if not index:
+        return []
+    return [info.file_name for base_name in sorted(index.groups) for info in index.groups[base_name][1]]
+
+
+# Newest version of base_name; _final counts unless include_final is False
+def latest(directory, base_name, extensions=None, include_final=True):
+    index = get_index(directory, extensions)
+    if not index or base_name not in index.groups:
+        return None
+    numbers, infos = index.groups[base_name]
+    end = len(numbers) if include_final else bisect.bisect_left(numbers, FINAL_VERSION)
+    return infos[end - 1] if end else None
+
+
+# Version N of base_name (the first file found if several extensions share the number)
+def find_version(directory, base_name, version, extensions=None):
+    index = get_index(directory, extensions)
+    if not index or base_name not in index.groups:
+        return None
+    numbers, infos = index.groups[base_name]
+    position = bisect.bisect_left(numbers, version)
+    if position < len(numbers) and numbers[position] == version:
+        return infos[position]
+    return None
+
+
+# Next free version number; taken lists extra names that hold numbers (e.g. archived versions)
+def next_version(directory, base_name, extensions=None, taken=()):
+    newest = latest(directory, base_name, extensions, include_final=False)
+    highest = newest.version if newest else 0
+    for file_name in taken:
+        info = parse_version(file_name)
+        if info.base_name == base_name and info.is_numbered:
+            highest = max(highest, info.version)
+    return highest + 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the versions of a directory in resolved order.")
+    parser.add_argument("directory")
+    parser.add_argument("--base-name", help="Only show this base name")
+    args = parser.parse_args()
+    for base_name in [args.base_name] if args.base_name else base_names(args.directory):
+        infos = all_versions(args.directory, base_name)
+        print(f"{base_name}: " + ", ".join(f"{info.label} ({info.file_name})" for info in infos))
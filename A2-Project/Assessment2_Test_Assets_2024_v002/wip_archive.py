@@ -0,0 +1,247 @@
+import gzip
+import os
+import json
+import shutil
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import project_fs
+import version_resolver
+
+# zstd is optional, gzip is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Cold tier lives under <project>/archive unless A2_ARCHIVE_ROOT points somewhere slower/cheaper
+ARCHIVE_ROOT_ENV = "A2_ARCHIVE_ROOT"
+SCENE_EXTENSIONS = ('.ma', '.mb')
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+CHUNK_SIZE = 4 * 1024 * 1024
+# Hidden file in each publish directory: {published file name: wip file it was published from}
+PUBLISH_SOURCES_FILE = ".published_from.json"
+
+
+# Get the archive root that mirrors <project>/wip
+def get_archive_root(project_root):
+    archive_root = os.environ.get(ARCHIVE_ROOT_ENV) or os.path.join(project_root, "archive")
+    return os.path.join(os.path.normpath(archive_root), "wip")
+
+
+# Map a live wip directory to its directory in the cold archive
+def get_archive_dir(project_root, wip_dir):
+    relative_path = os.path.relpath(os.path.normpath(wip_dir), os.path.join(project_root, "wip"))
+    return os.path.normpath(os.path.join(get_archive_root(project_root), relative_path))
+
+
+# Map a live wip directory to the matching publish directory
+def get_publish_dir(project_root, wip_dir):
+    relative_path = os.path.relpath(os.path.normpath(wip_dir), os.path.join(project_root, "wip"))
+    return os.path.normpath(os.path.join(project_root, "publish", relative_path))
+
+
+# Strip the compression suffix from an archived file name
+def strip_compression_suffix(file_name):
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return None
+
+
+# List the version files of a wip directory that only exist in the archive
+def list_archived(project_root, wip_dir):
+    entries = project_fs.get_fs(project_root).scandir(get_archive_dir(project_root, wip_dir))
+    archived = []
+    for file_name, _, _ in entries or []:
+        original_name = strip_compression_suffix(file_name)
+        if original_name and original_name.endswith(SCENE_EXTENSIONS):
+            archived.append(original_name)
+    return sorted(archived)
+
+
+# Find the archived copy of a version file, if there is one
+def find_archived_file(project_root, wip_dir, file_name):
+    fs = project_fs.get_fs(project_root)
+    archive_dir = get_archive_dir(project_root, wip_dir)
+    for suffix in COMPRESSION_SUFFIXES.values():
+        archive_path = os.path.join(archive_dir, file_name + suffix)
+        if fs.isfile(archive_path):
+            return archive_path
+    return None
+
+
+def is_archived(project_root, wip_dir, file_name):
+    return find_archived_file(project_root, wip_dir, file_name) is not None
+
+
+# Remember which wip version a publish came from, so the archive never takes it away
+def record_publish_source(publish_dir, published_name, wip_name):
+    sources_path = os.path.join(publish_dir, PUBLISH_SOURCES_FILE)
+    sources = read_publish_sources(publish_dir)
+    sources[published_name] = wip_name
+    temp_path = sources_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(sources, f, indent=2, sort_keys=True)
+    os.replace(temp_path, sources_path)
+
+
+def read_publish_sources(publish_dir):
+    try:
+        with open(os.path.join(publish_dir, PUBLISH_SOURCES_FILE)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+# Flush a file (or, on posix, a directory entry) to disk before its other copy is removed
+def _fsync(path):
+    if os.path.isdir(path):
+        if os.name != "posix":
+            return
+        fd = os.open(path, os.O_RDONLY)
+    else:
+        fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _open_compressed_writer(archive_path, compression, level):
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requested but the zstandard module is not installed")
+        return zstandard.ZstdCompressor(level=level or 10).stream_writer(open(archive_path, "wb"))
+    return gzip.open(archive_path, "wb", compresslevel=level or 6)
+
+
+def _open_compressed_reader(archive_path):
+    if archive_path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"Cannot restore {archive_path}: the zstandard module is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(open(archive_path, "rb"), closefd=True)
+    return gzip.open(archive_path, "rb")
+
+
+# Compress one version into the archive and remove it from fast storage
+def archive_file(file_path, archive_path, compression="gzip", level=None):
+    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+    temp_path = archive_path + ".tmp"
+    with open(file_path, "rb") as source, _open_compressed_writer(temp_path, compression, level) as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+    shutil.copystat(file_path, temp_path)
+    _fsync(temp_path)
+    os.replace(temp_path, archive_path)
+    # The archived copy and its rename must be on disk before the only other copy goes away
+    _fsync(os.path.dirname(archive_path))
+    original_size = os.path.getsize(file_path)
+    os.remove(file_path)
+    return original_size, os.path.getsize(archive_path)
+
+
+# Decompress an archived version back into its wip directory
+def restore_version(project_root, wip_dir, file_name):
+    archive_path = find_archived_file(project_root, wip_dir, file_name)
+    if not archive_path:
+        raise FileNotFoundError(f"No archived copy of {file_name} for {wip_dir}")
+    file_path = os.path.join(wip_dir, file_name)
+    temp_path = file_path + ".restoring"
+    os.makedirs(wip_dir, exist_ok=True)
+    with _open_compressed_reader(archive_path) as source, open(temp_path, "wb") as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+    shutil.copystat(archive_path, temp_path)
+    _fsync(temp_path)
+    os.replace(temp_path, file_path)
+    _fsync(wip_dir)
+    os.remove(archive_path)
+    fs = project_fs.get_fs(project_root)
+    fs.invalidate(file_path)
+    fs.invalidate(archive_path)
+    print(f"Restored {file_name} from archive")
+    return file_path
+
+
+# Group the scene files of one directory by base name -> [(version, file_name)]
+def group_versions(file_names):
+    groups = {}
+    for file_name in file_names:
+        if not file_name.endswith(SCENE_EXTENSIONS):
+            continue
+        info = version_resolver.parse_version(file_name)
+        if info.is_numbered:
+            groups.setdefault(info.base_name, []).append((info.version, file_name))
+    for versions in groups.values():
+        versions.sort()
+    return groups
+
+
+# Decide which versions of a wip directory should move to the archive
+def select_versions_to_archive(project_root, wip_dir, file_names, keep_last=3, keep_published=True):
+    keep_last = max(keep_last, 1)  # the newest version always stays on fast storage
+    published = set()
+    if keep_published:
+        # Files published under the same name, plus the wip versions behind renamed publishes (_final)
+        publish_dir = get_publish_dir(project_root, wip_dir)
+        entries = project_fs.get_fs(project_root).scandir(publish_dir)
+        published = {name for name, _, _ in entries or []}
+        published.update(read_publish_sources(publish_dir).values())
+
+    to_archive = []
+    for versions in group_versions(file_names).values():
+        for _, file_name in versions[:-keep_last]:
+            if file_name not in published:
+                to_archive.append(file_name)
+    return to_archive
+
+
+# Walk <project>/wip and collect (file_path, archive_path) pairs for the retention rules
+@project_fs.operation()
+def plan_archive(project_root, keep_last=3, keep_published=True, compression="gzip"):
+    project_root = os.path.normpath(project_root)
+    wip_root = os.path.join(project_root, "wip")
+    suffix = COMPRESSION_SUFFIXES[compression]
+    plan = []
+    for root, dirs, files in project_fs.get_fs(project_root).walk(wip_root):
+        for file_name in select_versions_to_archive(project_root, root, files, keep_last, keep_published):
+            archive_path = os.path.join(get_archive_dir(project_root, root), file_name + suffix)
+            plan.append((os.path.join(root, file_name), archive_path))
+    return plan
+
+
+# Apply the retention rules, compressing old versions in parallel
+def archive_old_versions(project_root, keep_last=3, keep_published=True, compression="gzip",
+                         level=None, workers=4, dry_run=False):
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        print("zstandard module not available, falling back to gzip")
+        compression = "gzip"
+
+    plan = plan_archive(project_root, keep_last, keep_published, compression)
+    if dry_run:
+        for file_path, archive_path in plan:
+            print(f"Would archive {file_path} -> {archive_path}")
+        return plan, 0, 0
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        results = list(executor.map(lambda item: archive_file(item[0], item[1], compression, level), plan))
+
+    original_bytes = sum(r[0] for r in results)
+    archived_bytes = sum(r[1] for r in results)
+    print(f"Archived {len(plan)} versions: {original_bytes / 1e6:.1f} MB -> {archived_bytes / 1e6:.1f} MB")
+    return plan, original_bytes, archived_bytes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old WIP versions into the compressed archive tier.")
+    parser.add_argument("project_root", help="Project root containing wip/ and publish/")
+    parser.add_argument("--keep-last", type=int, default=3, help="Number of newest versions to keep live per file")
+    parser.add_argument("--archive-published", action="store_true", help="Also archive versions that were published")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION_SUFFIXES), default="gzip")
+    parser.add_argument("--level", type=int, default=None, help="Compression level")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    archive_old_versions(args.project_root, args.keep_last, not args.archive_published,
+                         args.compression, args.level, args.workers, args.dry_run)
@@ -8,6 +8,8 @@ import maya.OpenMayaUI as omui
 import maya.cmds as cmds
 import maya.mel as mel
 
+import Duane_HDA_Indexer
+
 # load houdini engine plugin
 if cmds.pluginInfo("houdiniEngine", query=True) == False:
     cmds.loadPlugin("houdiniEngine")
@@ -27,6 +29,9 @@ class OpenImportDialog(QtWidgets.QDialog):
     selected_filter = "All Files (*.*)"
     dlg_instance = None
     
+    HDA_LIBRARY_DIR = r"F:\Art_Software\Houdini\Houdini_HDAs"
+    loaded_hda_libraries = set()
+    
     @classmethod
     def show_dialog(cls):
         if not cls.dlg_instance:
@@ -45,6 +50,8 @@ class OpenImportDialog(QtWidgets.QDialog):
         self.setMinimumSize(450, 80)
         self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint) # Get rid of the '?'
         
+        self.hda_definitions = None # indexed on the first search, re-read only on Refresh
+        
         self.create_widgets()
         self.create_layout()
         self.create_connections()
@@ -64,6 +71,14 @@ class OpenImportDialog(QtWidgets.QDialog):
         
         self.force_cb = QtWidgets.QCheckBox("Force")
         
+        self.hda_search_le = QtWidgets.QLineEdit()
+        self.hda_search_le.setPlaceholderText("Search operators in {0}".format(self.HDA_LIBRARY_DIR))
+        self.hda_refresh_btn = QtWidgets.QPushButton()
+        self.hda_refresh_btn.setIcon(QtGui.QIcon(":refresh.png"))
+        self.hda_refresh_btn.setToolTip("Re-index HDA Library Folder")
+        self.hda_results_lw = QtWidgets.QListWidget()
+        self.hda_results_lw.setVisible(False)
+        
         self.apply_btn = QtWidgets.QPushButton("Apply")
         self.close_btn = QtWidgets.QPushButton("Close")
     
@@ -89,6 +104,11 @@ class OpenImportDialog(QtWidgets.QDialog):
         button_layout.addWidget(self.close_btn)
         
         form_layout.addRow("", self.force_cb)
+        hda_search_layout = QtWidgets.QHBoxLayout()
+        hda_search_layout.addWidget(self.hda_search_le)
+        hda_search_layout.addWidget(self.hda_refresh_btn)
+        form_layout.addRow("HDA Search:", hda_search_layout)
+        form_layout.addRow("", self.hda_results_lw)
         
         main_layout = QtWidgets.QVBoxLayout(self)
         main_layout.addLayout(form_layout)
@@ -99,16 +119,58 @@ class OpenImportDialog(QtWidgets.QDialog):
         
         self.open_rb.toggled.connect(self.update_force_visibility)
         
+        self.hda_search_le.textChanged.connect(self.search_hda_operators)
+        self.hda_refresh_btn.clicked.connect(self.refresh_hda_index)
+        self.hda_results_lw.itemClicked.connect(self.select_hda_result)
+        
         self.apply_btn.clicked.connect(self.load_file)
         self.close_btn.clicked.connect(self.close)
      
     def show_file_select_dialog(self):
-        file_path, self.selected_filter = QtWidgets.QFileDialog.getOpenFileName(self, "Select File", "F:\Art_Software\Houdini\Houdini_HDAs", self.FILE_FILTERS, self.selected_filter)
+        file_path, self.selected_filter = QtWidgets.QFileDialog.getOpenFileName(self, "Select File", self.HDA_LIBRARY_DIR, self.FILE_FILTERS, self.selected_filter)
         if file_path:
             self.filepath_le.setText(file_path)
       
     def update_force_visibility(self, checked):
         self.force_cb.setVisible(checked)
+    
+    def refresh_hda_index(self):
+        # -----------------------------------------------------------
+        # walk the library folder once; keystrokes only filter this list
+        # -----------------------------------------------------------
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            self.hda_definitions = Duane_HDA_Indexer.index_folder(self.HDA_LIBRARY_DIR)
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        self.search_hda_operators(self.hda_search_le.text())
+    
+    def search_hda_operators(self, text):
+        # -----------------------------------------------------------
+        # search the indexed HDA headers, nothing is loaded into Houdini Engine here
+        # -----------------------------------------------------------
+        self.hda_results_lw.clear()
+        if not text.strip():
+            self.hda_results_lw.setVisible(False)
+            return
+        
+        if self.hda_definitions is None:
+            self.refresh_hda_index()
+            return
+        
+        for definition in Duane_HDA_Indexer.filter_definitions(self.hda_definitions, text):
+            label = "{0}/{1}  {2}  ({3}, {4})".format(definition["table"], definition["name"], definition["version"],
+                                                      QtCore.QFileInfo(definition["library"]).fileName(),
+                                                      Duane_HDA_Indexer.format_size(definition["size"]))
+            item = QtWidgets.QListWidgetItem(label)
+            item.setToolTip(definition["label"])
+            item.setData(QtCore.Qt.UserRole, definition["library"])
+            self.hda_results_lw.addItem(item)
+        self.hda_results_lw.setVisible(True)
+    
+    def select_hda_result(self, item):
+        self.filepath_le.setText(QtCore.QDir.fromNativeSeparators(item.data(QtCore.Qt.UserRole)))
+        self.loadHDA_rb.setChecked(True)
        
     def load_file(self):
         
@@ -156,7 +218,19 @@ class OpenImportDialog(QtWidgets.QDialog):
         cmds.file(file_path, reference=True, ignoreVersion=True)
      
     def load_HDA(self, file_path):
+        # only load libraries that have not been loaded in this session yet
+        library_key = QtCore.QFileInfo(file_path).absoluteFilePath()
+        if library_key in self.loaded_hda_libraries:
+            om.MGlobal.displayInfo("HDA library already loaded: {0}".format(file_path))
+            return
+        
+        # read from the index cache unless the library changed since it was last indexed
+        definitions = Duane_HDA_Indexer.index_library(file_path)
+        Duane_HDA_Indexer.save_cache()
+        om.MGlobal.displayInfo("Loading HDA library {0} ({1} operators)".format(file_path, len(definitions)))
+        
         mel.eval('houdiniEngine_loadAssetLibrary(\"{}\")'.format(file_path))
+        self.loaded_hda_libraries.add(library_key)
         
 
 # PRODUCTION OPEN/CLOSE
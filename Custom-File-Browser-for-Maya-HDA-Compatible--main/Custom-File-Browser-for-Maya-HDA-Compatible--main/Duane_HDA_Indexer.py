@@ -0,0 +1,258 @@
+import io
+import os
+import json
+
+# -----------------------------------------------------------
+# Reads the operator table of .hda/.hdanc/.otl libraries straight from the
+# archive headers, so the custom file menu can search a whole HDA folder
+# without loading anything into Houdini Engine.
+#
+# An HDA library is an odc cpio archive: every section is a 76 byte ASCII
+# header, the section name and then the section data. INDEX__SECTION lists the
+# operators, Sections.list maps section names to operator names and each
+# operator's own section holds its definition (its size is what we report).
+# -----------------------------------------------------------
+
+HDA_EXTENSIONS = (".hda", ".hdanc", ".otl", ".otlnc")
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".duane_hda_index.json")
+
+CPIO_MAGIC = b"070707"
+CPIO_HEADER_SIZE = 76
+CPIO_TRAILER = "TRAILER!!!"
+
+# {library_path: {"mtime": float, "size": int, "definitions": [...], "error": str}}
+_index_cache = None
+_cache_dirty = False
+
+
+def _load_cache():
+    global _index_cache
+    if _index_cache is None:
+        _index_cache = {}
+        if os.path.isfile(CACHE_FILE):
+            try:
+                with io.open(CACHE_FILE, "r", encoding="utf-8") as f:
+                    _index_cache = json.load(f)
+            except (IOError, OSError, ValueError):
+                _index_cache = {}
+    return _index_cache
+
+
+def save_cache():
+    global _cache_dirty
+    if not _cache_dirty:
+        return
+    _cache_dirty = False
+    try:
+        with io.open(CACHE_FILE, "w", encoding="utf-8") as f:
+            f.write(json.dumps(_load_cache(), ensure_ascii=False))
+    except (IOError, OSError):
+        pass
+
+
+def read_sections(file_path):
+    # -----------------------------------------------------------
+    # walk the cpio headers, returning {name: (offset, size)} without reading section data
+    # -----------------------------------------------------------
+    sections = {}
+    with open(file_path, "rb") as f:
+        while True:
+            header = f.read(CPIO_HEADER_SIZE)
+            if len(header) < CPIO_HEADER_SIZE:
+                break
+            if header[:6] != CPIO_MAGIC:
+                raise ValueError("Not an HDA archive (bad section header): {0}".format(file_path))
+            name_size = int(header[59:65], 8)
+            file_size = int(header[65:76], 8)
+            name = f.read(name_size).rstrip(b"\0").decode("utf-8", "replace")
+            if name == CPIO_TRAILER:
+                break
+            sections[name] = (f.tell(), file_size)
+            f.seek(file_size, os.SEEK_CUR)
+    return sections
+
+
+def _read_section(file_path, offset, size):
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        return f.read(size).decode("utf-8", "replace")
+
+
+def parse_index_section(text):
+    # -----------------------------------------------------------
+    # INDEX__SECTION is blocks of "Key:  value" lines, one block per operator
+    # -----------------------------------------------------------
+    definitions = []
+    current = {}
+    for line in text.splitlines():
+        if not line.strip():
+            if current:
+                definitions.append(current)
+                current = {}
+            continue
+        key, _, value = line.partition(":")
+        if key == "Operator" and "Operator" in current:
+            definitions.append(current)
+            current = {}
+        current[key.strip()] = value.strip()
+    if current:
+        definitions.append(current)
+    return [d for d in definitions if "Operator" in d]
+
+
+def parse_sections_list(text):
+    # "section_name<TAB>Table/operator" per line, the first line is a quoted empty name
+    mapping = {}
+    for line in text.splitlines():
+        parts = line.split("\t")
+        if len(parts) >= 2 and parts[0]:
+            mapping[parts[1].strip()] = parts[0].strip()
+    return mapping
+
+
+def split_operator_name(operator):
+    # -----------------------------------------------------------
+    # namespaced operators look like "studio::mytool::2.0"
+    # -----------------------------------------------------------
+    parts = operator.split("::")
+    if len(parts) >= 3:
+        return "::".join(parts[:-1]), parts[-1]
+    if len(parts) == 2 and parts[1][:1].isdigit():
+        return parts[0], parts[1]
+    return operator, ""
+
+
+def _make_definition(entry, library_path, size):
+    operator = entry["Operator"]
+    name, version = split_operator_name(operator)
+    return {
+        "operator": operator,
+        "name": name,
+        "version": version,
+        "table": entry.get("Table", ""),
+        "label": entry.get("Label", ""),
+        "modified": entry.get("Modified", ""),
+        "size": size,
+        "library": library_path,
+    }
+
+
+def _index_archive(file_path):
+    sections = read_sections(file_path)
+    if "INDEX__SECTION" not in sections:
+        raise ValueError("No INDEX__SECTION in {0}".format(file_path))
+    entries = parse_index_section(_read_section(file_path, *sections["INDEX__SECTION"]))
+    section_names = {}
+    if "Sections.list" in sections:
+        section_names = parse_sections_list(_read_section(file_path, *sections["Sections.list"]))
+
+    definitions = []
+    for entry in entries:
+        full_name = "{0}/{1}".format(entry.get("Table", ""), entry["Operator"])
+        section = sections.get(section_names.get(full_name, ""))
+        definitions.append(_make_definition(entry, file_path, section[1] if section else 0))
+    return definitions
+
+
+def _index_expanded(dir_path):
+    # -----------------------------------------------------------
+    # expanded (hotl -x) libraries are plain folders with the same section files
+    # -----------------------------------------------------------
+    index_path = os.path.join(dir_path, "INDEX__SECTION")
+    with io.open(index_path, "r", encoding="utf-8", errors="replace") as f:
+        entries = parse_index_section(f.read())
+    section_names = {}
+    sections_list = os.path.join(dir_path, "Sections.list")
+    if os.path.isfile(sections_list):
+        with io.open(sections_list, "r", encoding="utf-8", errors="replace") as f:
+            section_names = parse_sections_list(f.read())
+
+    definitions = []
+    for entry in entries:
+        full_name = "{0}/{1}".format(entry.get("Table", ""), entry["Operator"])
+        section_path = os.path.join(dir_path, section_names.get(full_name, full_name.replace("/", "_1")))
+        size = 0
+        for root, dirs, files in os.walk(section_path):
+            size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        definitions.append(_make_definition(entry, dir_path, size))
+    return definitions
+
+
+def index_library(library_path):
+    # -----------------------------------------------------------
+    # definitions of one library, re-read only when its mtime or size changed
+    # -----------------------------------------------------------
+    global _cache_dirty
+    cache = _load_cache()
+    # an expanded library's folder mtime does not change when its index is edited
+    try:
+        if os.path.isdir(library_path):
+            stat = os.stat(os.path.join(library_path, "INDEX__SECTION"))
+        else:
+            stat = os.stat(library_path)
+    except (IOError, OSError):
+        return []
+    cached = cache.get(library_path)
+    if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+        return cached["definitions"]
+
+    error = ""
+    try:
+        if os.path.isdir(library_path):
+            definitions = _index_expanded(library_path)
+        else:
+            definitions = _index_archive(library_path)
+    except (IOError, OSError, ValueError) as e:
+        definitions = []
+        error = str(e)
+        print("Could not index HDA library {0}: {1}".format(library_path, error))
+
+    _cache_dirty = True
+    cache[library_path] = {"mtime": stat.st_mtime, "size": stat.st_size,
+                           "definitions": definitions, "error": error}
+    return definitions
+
+
+def find_libraries(folder):
+    libraries = []
+    for root, dirs, files in os.walk(folder):
+        expanded = [d for d in dirs if d.lower().endswith(HDA_EXTENSIONS)]
+        libraries.extend(os.path.join(root, d) for d in expanded)
+        dirs[:] = [d for d in dirs if d not in expanded and not d.startswith(".")]
+        libraries.extend(os.path.join(root, f) for f in files if f.lower().endswith(HDA_EXTENSIONS))
+    return sorted(libraries)
+
+
+def index_folder(folder):
+    definitions = []
+    for library_path in find_libraries(folder):
+        definitions.extend(index_library(library_path))
+    save_cache()
+    return definitions
+
+
+def filter_definitions(definitions, text, limit=200):
+    # -----------------------------------------------------------
+    # case-insensitive match on operator name, label or table ("sop/scatter" works too)
+    # pure in-memory filter, cheap enough to run on every keystroke
+    # -----------------------------------------------------------
+    text = text.strip().lower()
+    results = []
+    for definition in definitions:
+        haystack = "{table}/{operator} {label}".format(**definition).lower()
+        if not text or text in haystack:
+            results.append(definition)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def search(folder, text, limit=200):
+    # one-off search; re-indexes the folder, so UIs should keep index_folder's result instead
+    return filter_definitions(index_folder(folder), text, limit)
+
+
+def format_size(size):
+    if size >= 1024 * 1024:
+        return "{0:.1f} MB".format(size / (1024.0 * 1024.0))
+    return "{0:.1f} KB".format(size / 1024.0)